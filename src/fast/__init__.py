@@ -11,9 +11,10 @@ __license__ = "BSD-3"
 __version__ = '0.1.0'  # Use single quotes for bumpversion (see setup.cfg)
 
 from .cbfs import CBFS
-from .density import ast_density, dfa_density
+from .density import ast_density, dfa_densities, dfa_density
 from .fast import fast, fast_from_re, fast_from_strings, fast_benchmark
 from .multi_grep import (
+    MultiDfa,
     MultiGrepFonctorAll,
     MultiGrepFonctorLargest,
     MultiGrepFonctorGreedy,
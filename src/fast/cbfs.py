@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 import heapq as hq
+from math import log2
 
 
 class CBFS:
@@ -29,6 +30,23 @@ class CBFS:
         self.num_popped = 0           # The number of popped item from the active CBFS queue in the current cycle.
         self.num_to_pop = 1           # The number of items to pop from a queue for each cycle.
         self.num_items = 0            # The number of items stored in the CBFS queues.
+        self.nonempty = 0             # Bitset, the i-th bit is set iff the i-th queue is not empty.
+
+    def next_nonempty_queue(self, idx: int) -> int:
+        """
+        Finds the first non-empty queue, cycling from a given queue index.
+
+        Args:
+            idx (int): The index of the first queue to be considered.
+
+        Returns:
+            The index of the first non-empty queue found from ``idx``.
+        """
+        mask = self.nonempty >> idx
+        if mask:
+            return idx + (mask & -mask).bit_length() - 1
+        mask = self.nonempty
+        return (mask & -mask).bit_length() - 1
 
     def pop(self) -> object:
         """
@@ -42,11 +60,15 @@ class CBFS:
         if self.num_popped == self.num_to_pop:
             self.pop_idx = (self.pop_idx + 1) % self.num_queues
             self.num_popped = 0
-        while len(self.queues[self.pop_idx]) == 0:
-            self.pop_idx = (self.pop_idx + 1) % self.num_queues
+        pop_idx = self.next_nonempty_queue(self.pop_idx)
+        if pop_idx != self.pop_idx:
+            self.pop_idx = pop_idx
             self.num_popped = 0
 
-        result = hq.heappop(self.queues[self.pop_idx])
+        queue = self.queues[pop_idx]
+        result = hq.heappop(queue)
+        if not queue:
+            self.nonempty &= ~(1 << pop_idx)
         self.num_popped += 1
         self.num_items -= 1  # TODO if self.num_items > 0:
         return result
@@ -61,8 +83,34 @@ class CBFS:
                 It must verifies ``0 <= push_idx < self.num_queues``.
         """
         hq.heappush(self.queues[push_idx], item)
+        self.nonempty |= 1 << push_idx
         self.num_items += 1
 
+    def push_many(self, items: list, push_idx: int):
+        """
+        Pushes several items to the same queue of this :py:class:`CBFS` instance.
+        If there are many items w.r.t. the size of the queue, the queue
+        is extended and heapified at once (O(n)) instead of pushing
+        each item (O(len(items) * log(n))).
+
+        Args:
+            items (list): The items to be pushed.
+            push_idx (int): The queue index where the item must be pushed.
+                It must verifies ``0 <= push_idx < self.num_queues``.
+        """
+        if not items:
+            return
+        queue = self.queues[push_idx]
+        n = len(queue) + len(items)
+        if len(items) > n / log2(n + 1):
+            queue.extend(items)
+            hq.heapify(queue)
+        else:
+            for item in items:
+                hq.heappush(queue, item)
+        self.nonempty |= 1 << push_idx
+        self.num_items += len(items)
+
     def is_empty(self) -> bool:
         """
         Checks whether this :py:class:`CBFS` instance contains at least one item.
@@ -7,6 +7,107 @@ from pybgl.regexp import compile_dfa
 from .regexp_ast import RegexpAst
 
 
+def dfa_to_sparse_matrix(dfa: Automaton) -> tuple:
+    """
+    Flattens the transitions of an automaton to a CSR-like
+    (compressed sparse row) representation, so that it can be
+    traversed many times without the ``dict`` overhead.
+
+    Args:
+        dfa (Automaton): A :py:class:`pybgl.Automaton` instance.
+
+    Returns:
+        A ``(indptr, indices, initials, finals)`` tuple where
+        the vertices of ``dfa`` are renumbered from ``0`` to ``n - 1``,
+        ``indices[indptr[i]:indptr[i + 1]]`` lists the targets of the
+        transitions outgoing the ``i``-th vertex, ``initials`` (resp. ``finals``)
+        lists the indices of the initial (resp. final) states.
+    """
+    map_q_idx = {q: idx for (idx, q) in enumerate(vertices(dfa))}
+    indptr = [0]
+    indices = list()
+    for adj_q in dfa.m_adjacencies.values():
+        indices.extend(map_q_idx[r] for r in adj_q.values())
+        indptr.append(len(indices))
+    initials = [idx for (q, idx) in map_q_idx.items() if dfa.is_initial(q)]
+    finals = [idx for (q, idx) in map_q_idx.items() if dfa.is_final(q)]
+    return (indptr, indices, initials, finals)
+
+
+def propagate_probas(
+    indptr: list,
+    indices: list,
+    probas_in: list,
+    probas_out: list,
+    char_proba: float
+):
+    """
+    Performs one step of the density propagation, i.e.,
+    ``probas_out = char_proba * A^T . probas_in`` where ``A`` is the
+    adjacency matrix encoded by ``indptr`` and ``indices``
+    (see :py:func:`dfa_to_sparse_matrix`).
+
+    This loop only involves flat integer and float sequences,
+    so that it can be compiled (e.g., by numba) if needed.
+
+    Args:
+        indptr (list): The row pointers of the adjacency matrix.
+        indices (list): The column indices of the adjacency matrix.
+        probas_in (list): The input probability vector.
+        probas_out (list): The output probability vector, overwritten.
+        char_proba (float): The probability to pick a given character in the alphabet.
+    """
+    n = len(probas_in)
+    probas_out[:] = [0] * n
+    for q in range(n):
+        p_q = probas_in[q]
+        if not p_q:
+            continue
+        p_q *= char_proba
+        for idx in range(indptr[q], indptr[q + 1]):
+            probas_out[indices[idx]] += p_q
+
+
+def dfa_densities(dfa: Automaton, lengths: iter, char_proba: float) -> dict:
+    """
+    Computes the densities of an automaton for several word lengths.
+    The probability vector is propagated once up to the largest length,
+    and read at each requested length, instead of restarting from
+    the initial state for each length.
+
+    Args:
+        dfa (Automaton): A :py:class:`pybgl.Automaton` instance.
+        lengths (iter): The considered lengths (positive integers).
+        char_proba (float): The probability to pick a given character in the alphabet.
+
+    Returns:
+        A ``dict{int: float}`` mapping each length with the
+        corresponding density (see :py:func:`dfa_density`).
+    """
+    lengths = set(lengths)
+    if not lengths:
+        return dict()
+    (indptr, indices, initials, finals) = dfa_to_sparse_matrix(dfa)
+    n = len(indptr) - 1
+    # Double buffering: the two vectors are swapped at each step
+    probas = [0] * n
+    new_probas = [0] * n
+    for idx in initials:
+        probas[idx] = 1
+    map_len_density = dict()
+    max_length = max(lengths)
+    length = 0
+    while True:
+        if length in lengths:
+            map_len_density[length] = sum(probas[idx] for idx in finals)
+        if length == max_length:
+            break
+        propagate_probas(indptr, indices, probas, new_probas, char_proba)
+        (probas, new_probas) = (new_probas, probas)
+        length += 1
+    return map_len_density
+
+
 def dfa_density(dfa: Automaton, length: int, char_proba: float):
     """
     Computes the ratio of the number of words of length ``length``
@@ -22,24 +123,8 @@ def dfa_density(dfa: Automaton, length: int, char_proba: float):
     Returns:
         The density of ``a`` if we restrict to the words of length ``length``.
     """
-    # TODO: this is a kind of pagerank assuming that DFA is acyclic, but the
-    # results depends on the order the vertices are visited. So the implementation
-    # below is inaccurate.
     # TODO: remove char_proba parameter.
-    map_q_proba = {
-        q: 1 if dfa.is_initial(q) else 0
-        for q in vertices(dfa)
-    }
-    for _ in range(length):
-        new_map_q_proba = {q: 0 for q in vertices(dfa)}
-        for (q, adj_q) in dfa.m_adjacencies.items():
-            for (a, r) in adj_q.items():
-                new_map_q_proba[r] += char_proba * map_q_proba[q]
-        map_q_proba = new_map_q_proba
-    return sum(
-        map_q_proba[q] if dfa.is_final(q) else 0
-        for q in vertices(dfa)
-    )
+    return dfa_densities(dfa, (length,), char_proba)[length]
 
 
 def ast_density(
@@ -72,14 +157,9 @@ def ast_density(
             infix_regexp = infix_regexp.replace(pa, "(" + infix_re + ")")
     # print("     after replacing: %s" % infix_regexp)
     dfa = compile_dfa(infix_regexp)
-    # mini_dfa = brzozowski_minimization(dfa)
-    map_example_len_density = {
-        # length: dfa_density(mini_dfa, length, char_proba)
-        length: dfa_density(dfa, length, char_proba)
-        for length in map_len_proba.keys()
-    }
+    map_len_density = dfa_densities(dfa, map_len_proba.keys(), char_proba)
     result = sum(
-        map_example_len_density[length] * map_len_proba[length]
+        map_len_density[length] * map_len_proba[length]
         for length in map_len_proba.keys()
     )
     # print("        Done, density = %s" % result)
@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from time import time
-from pybgl.ipynb import ipynb_display_graph
 
 from .cbfs import CBFS
 from .find_ast_visitor import FindAstFromStringsDefaultVisitor
@@ -13,8 +14,8 @@ from .objective_func import (
     make_normalized_additive_objective_func_for_str,
 )
 from .pattern_automaton import PatternAutomaton
-from .regexp_ast import RegexpAst
-from .regexp_mutators import MUTATORS
+from .regexp_ast import RegexpAst, SubtreeTable
+from .regexp_mutators import MUTATORS, make_mutators_by_kind
 
 
 (OBJ_ADD, OBJ_MULT, OBJ_ADD_NORM, OBJ_TUPLE) = range(4)
@@ -49,12 +50,213 @@ def shortness_factor(examples: iter) -> float:
     return 1 / (2 * n)
 
 
+def make_next_symbols(example) -> callable:
+    """
+    Builds the function listing the symbols that can be consumed in an
+    example from a given position. The type of the example is only checked
+    once, and the results are memoized per position.
+
+    Args:
+        example: A positive example (:py:class:`PatternAutomaton` or ``str``).
+
+    Returns:
+        A ``callable(j) -> list`` returning the ``(sigma, k, prefix)`` tuples
+        where ``sigma`` is a symbol that can be consumed from position ``j``,
+        ``k`` the position reached once it is consumed, and ``prefix`` the
+        prefix of the example processed so far (passed to the mutators).
+    """
+    cache = dict()
+    if isinstance(example, PatternAutomaton):
+        pa = example
+        w = pa.w
+
+        def next_symbols(j: int) -> list:
+            symbols = cache.get(j)
+            if symbols is None:
+                symbols = cache[j] = [
+                    (pa.label(e), pa.target(e), w[:pa.target(e) + 1])
+                    for e in pa.out_edges(j)
+                ]
+            return symbols
+    else:  # str
+        w = example
+
+        def next_symbols(j: int) -> list:
+            symbols = cache.get(j)
+            if symbols is None:
+                symbols = cache[j] = [(w[j], j + 1, w[:j + 1])]
+            return symbols
+    return next_symbols
+
+
+def generate_mutants(
+    ast: RegexpAst,
+    active_leaf: int,
+    i: int,
+    j: int,
+    examples: list,
+    mutators_by_kind: dict,
+    examples_next_symbols: list = None
+) -> iter:
+    """
+    Generates lazily the (non simplified) mutants of an AST.
+
+    Args:
+        ast (RegexpAst): The AST to be mutated.
+        active_leaf (int): The active leaf of ``ast``.
+        i (int): The index of the current positive example.
+        j (int): The current position in the current positive example.
+        examples (list): The positive examples.
+        mutators_by_kind (dict): Maps each kind of arc (see
+            :py:meth:`RegexpAst.arc_kind`) with the mutators to apply on it.
+        examples_next_symbols (list): The :py:func:`make_next_symbols`
+            function of each example. Pass ``None`` to build it on the fly.
+
+    Returns:
+        An iterator over the ``(mutator, new_ast, new_active_leaf, k)``
+        tuples, where ``k`` is the position reached in the current example.
+    """
+    example = examples[i]
+    symbols = (
+        examples_next_symbols[i] if examples_next_symbols
+        else make_next_symbols(example)
+    )(j)
+    previous_examples = examples[:i]
+    active_leaf_parent = ast.map_node_parent[active_leaf]
+    epsilon_reachable_arcs = ast.epsilon_reachables(
+        active_leaf, active_leaf_parent
+    )
+    # print("eps reachables: %s" % epsilon_reachable_arcs)
+    for (u, v) in epsilon_reachable_arcs:
+        for mutator in mutators_by_kind[ast.arc_kind(u, v)]:
+            for (sigma, k, prefix) in symbols:
+                # print("       **", a)
+                for (new_ast, new_active_leaf) in mutator.mutate_iter(
+                    ast,
+                    sigma,
+                    u,
+                    v,
+                    prefix,
+                    previous_examples,
+                    epsilon_reachable_arcs,
+                    example
+                ):
+                    yield (mutator, new_ast, new_active_leaf, k)
+
+
+def cache_value(cache: OrderedDict, key, value, max_size: int = None):
+    """
+    Inserts a value in a least recently used (LRU) cache. If the cache
+    is full, its least recently used value is evicted. The caller is in
+    charge of calling ``cache.move_to_end(key)`` on each cache hit.
+
+    Args:
+        cache (OrderedDict): The cache.
+        key: The key.
+        value: The value mapped with ``key``.
+        max_size (int): The maximum number of values stored in ``cache``.
+            Pass ``None`` for an unbounded cache.
+    """
+    cache[key] = value
+    if max_size is not None and len(cache) > max_size:
+        cache.popitem(last=False)
+
+
+# State of the worker processes spawned by fast_from_strings, see init_worker.
+WORKER_STATE = dict()
+
+
+def init_worker(
+    examples: list,
+    mutators: list,
+    mutators_by_kind: dict,
+    objective_function: callable,
+    objective_cache_size: int = None
+):
+    """
+    Initializes a worker process used by :py:func:`fast_from_strings`
+    to expand ASTs in parallel (see :py:func:`expand_in_worker`).
+
+    Args:
+        examples (list): The positive examples.
+        mutators (list): The list of `Mutator` instances.
+        mutators_by_kind (dict): See :py:func:`generate_mutants`.
+        objective_function (callable): The objective function.
+        objective_cache_size (int): The maximum number of objective
+            function values cached by the worker process.
+            Pass ``None`` for an unbounded cache.
+    """
+    WORKER_STATE.update(
+        examples=examples,
+        examples_next_symbols=[make_next_symbols(example) for example in examples],
+        map_mutator_idx={
+            id(mutator): idx
+            for (idx, mutator) in enumerate(mutators)
+        },
+        mutators_by_kind=mutators_by_kind,
+        objective_function=objective_function,
+        map_key_value=OrderedDict(),
+        # Shared by the ASTs expanded by this worker process, hence
+        # released together with the worker process (see expand_in_worker).
+        subtree_table=SubtreeTable(),
+        objective_cache_size=objective_cache_size,
+    )
+
+
+def expand_in_worker(task: tuple) -> list:
+    """
+    Builds, simplifies and evaluates the mutants of an AST in a worker process.
+
+    Args:
+        task (tuple): The ``(ast, active_leaf, i, j)`` tuple to be expanded.
+
+    Returns:
+        The list of ``(mutator_idx, new_ast, new_active_leaf, k, obj_func_value)``
+        tuples, where ``mutator_idx`` is the index of the mutator in the
+        list of mutators passed to :py:func:`init_worker`.
+    """
+    (ast, active_leaf, i, j) = task
+    # The keys of the ASTs expanded by this worker, and hence the keys
+    # of map_key_value, must come from the same table.
+    ast.subtree_table = WORKER_STATE["subtree_table"]
+    examples = WORKER_STATE["examples"]
+    map_mutator_idx = WORKER_STATE["map_mutator_idx"]
+    objective_function = WORKER_STATE["objective_function"]
+    map_key_value = WORKER_STATE["map_key_value"]
+    result = list()
+    for (mutator, new_ast, new_active_leaf, k) in generate_mutants(
+        ast, active_leaf, i, j, examples, WORKER_STATE["mutators_by_kind"],
+        WORKER_STATE["examples_next_symbols"]
+    ):
+        new_ast.simplify()
+        ast_key = new_ast.key()
+        value = map_key_value.get(ast_key)
+        if value is None:
+            value = objective_function(new_ast, examples)
+            cache_value(
+                map_key_value, ast_key, value,
+                WORKER_STATE["objective_cache_size"]
+            )
+        else:
+            map_key_value.move_to_end(ast_key)
+        result.append((
+            map_mutator_idx[id(mutator)], new_ast, new_active_leaf, k, value
+        ))
+    return result
+
+
 def fast_from_strings(
     examples: list,
     objective_function: callable = None,
     stop_condition: callable = None,
     mutators: list = None,
-    visitor: FindAstFromStringsDefaultVisitor = None
+    visitor: FindAstFromStringsDefaultVisitor = None,
+    max_pushes_per_pop: int = None,
+    num_workers: int = None,
+    batch_size: int = None,
+    objective_cache_size: int = None,
+    alphabet: set = None,
+    mp_context=None
 ) -> list:
     """
     Regular expression inference algorithm.
@@ -71,6 +273,38 @@ def fast_from_strings(
             - the returned value is ``True`` iff the execution must be stopped.
 
         mutators (list): The list of `Mutator` instances used to update the ASTs.
+        visitor (FindAstFromStringsDefaultVisitor): The visitor used to
+            instrument the search.
+        max_pushes_per_pop (int): The maximum number of children pushed
+            in the queue for each popped AST. In the sequential search,
+            mutants are generated lazily, so the remaining ones are neither
+            built nor evaluated. If ``num_workers`` is set, the worker
+            processes build and evaluate every mutant, and the budget only
+            limits the pushes. Pass ``None`` to push every child.
+        num_workers (int): The number of worker processes used to expand
+            the popped ASTs. Pass ``None`` to expand them sequentially
+            in the current process. As a whole batch of ASTs is popped
+            before pushing their children, the exploration order, and hence
+            the returned solutions, may differ from the sequential search.
+        batch_size (int): The number of ASTs popped at once and expanded
+            in parallel, if ``num_workers`` is set. The stop condition is only
+            checked between two batches. Defaults to ``num_workers``.
+        objective_cache_size (int): The maximum number of objective function
+            values cached during the search. The results of the recognition
+            of the examples are cached with the same bound.
+            Defaults to ``None`` (unbounded caches), so that the values
+            are never recomputed; pass a bound to cap the memory used by
+            long searches, at the cost of recomputing the evicted values.
+        alphabet (set): The symbols involved in ``examples``, used by the default
+            objective function. Pass ``None`` to compute it from ``examples``.
+        mp_context (multiprocessing.context.BaseContext): The context used
+            to start the worker processes, if ``num_workers`` is set.
+            Pass ``None`` to use the default start method. Unless the
+            worker processes are forked (``multiprocessing.get_context("fork")``),
+            the examples, the mutators and the objective function are pickled,
+            so a custom objective function must be picklable (e.g. not a
+            closure), like the ones returned by the
+            ``make_*_objective_func_for_str`` functions.
 
     Returns:
         A list of final solutions, once the queue is empty (dream on),
@@ -82,7 +316,8 @@ def fast_from_strings(
     if visitor is None:
         visitor = FindAstFromStringsDefaultVisitor()
     if objective_function is None:
-        alphabet = set(a for w in examples for a in w)
+        if alphabet is None:
+            alphabet = set().union(*examples)
         alpha = shortness_factor(examples)
         objective_function = make_normalized_additive_objective_func_for_str(
             examples=examples,
@@ -96,6 +331,17 @@ def fast_from_strings(
     if mutators is None:
         mutators = [mutator(MUTATORS) for mutator in MUTATORS]
 
+    # For each kind of arc, the mutators that may apply on it
+    mutators_by_kind = make_mutators_by_kind(mutators)
+
+    # cum_lens[i] is the total length of the i first examples
+    cum_lens = [0] * (len(examples) + 1)
+    for (idx, example) in enumerate(examples):
+        cum_lens[idx + 1] = cum_lens[idx] + (
+            len(example.w) if isinstance(example, PatternAutomaton)
+            else len(example)
+        )
+
     def indices_to_depth(i: int, k: int) -> int:
         """
         Converts `(i, k)` pair, where `i` is the index of the word being
@@ -111,55 +357,45 @@ def fast_from_strings(
         Returns:
             The current progression.
         """
-        return sum(
-            len(example.w) if isinstance(example, PatternAutomaton)
-            else len(example)
-            for example in examples[:i]
-        ) + k
-
-    def next_symbols(example, j: int) -> iter:
-        if isinstance(example, PatternAutomaton):
-            pa = example
-            return (
-                (pa.label(e), pa.target(e))
-                for e in pa.out_edges(j)
-            )
-        else:  # str
-            sigma = w[j]
-            k = j + 1
-            return [(sigma, k)]
+        return cum_lens[i] + k
+
+    examples_next_symbols = [make_next_symbols(example) for example in examples]
 
     # Maximum progression of the problem
-    total_depth = sum(
-        len(example.w) if isinstance(example, PatternAutomaton)
-        else len(example)
-        for example in examples
-    ) + 1
+    total_depth = cum_lens[-1] + 1
 
     # Keep track of the pushed regexps to prevent duplicates
-    pushed_regexps = {
-        depth: set()
-        for depth in range(total_depth)
-    }
+    # (the sets are only allocated for the progressions actually reached)
+    pushed_regexps = defaultdict(set)
 
     def was_already_pushed(ast: RegexpAst, active_leaf: int, push_idx: int) -> bool:
         """
         Checks whether an AST has already been seen. To check this the AST
-        is converted to a string identifier and this key is stored in
-        `pushed_regexps`.
+        is converted to its hash-consed key (see :py:meth:`RegexpAst.key`)
+        and this key is stored in `pushed_regexps`.
         """
         # print(ast.to_prefix_regexp_list())
         # ipynb_display_graph(ast)
-        ast_key = '$'.join(ast.to_prefix_regexp_list()), active_leaf
-        if ast_key in pushed_regexps[push_idx]:
+        ast_key = (ast.key(), active_leaf)
+        pushed = pushed_regexps[push_idx]
+        if ast_key in pushed:
             return True
         else:
-            pushed_regexps[push_idx].add(ast_key)
+            pushed.add(ast_key)
             return False
 
     # Cache to keep track of regexps objective_function's value,
-    # to prevent redundant computations
-    map_regexp_value = dict()
+    # to prevent redundant computations. It is bounded to
+    # objective_cache_size entries, the least recently used ones
+    # being evicted first.
+    map_regexp_value = OrderedDict()
+
+    def cache_objective_value(ast_key: int, value: float):
+        """
+        Caches the objective function value of an AST, evicting the
+        least recently used value if the cache is full.
+        """
+        cache_value(map_regexp_value, ast_key, value, objective_cache_size)
 
     def compute_objective_value(
         ast: RegexpAst,
@@ -177,12 +413,52 @@ def fast_from_strings(
             The corresponding objective function value. The lower
             this value, the better the candidate solution.
         """
-        ast_key = '$'.join(ast.to_prefix_regexp_list())
-        if ast_key not in map_regexp_value.keys():
-            map_regexp_value[ast_key] = objective_function(
-                ast, examples
+        ast_key = ast.key()
+        value = map_regexp_value.get(ast_key)
+        if value is None:
+            value = objective_function(ast, examples)
+            cache_objective_value(ast_key, value)
+        else:
+            map_regexp_value.move_to_end(ast_key)
+        return value
+
+    # Maps each AST key with a pair (n, failed) where n is the number
+    # of leading examples known to be recognized by this AST and
+    # failed is True iff examples[n] is known not to be recognized.
+    # Like map_regexp_value, it is bounded to objective_cache_size entries.
+    map_key_recognized = OrderedDict()
+
+    def recognizes_examples(ast: RegexpAst, n: int) -> bool:
+        """
+        Checks whether an AST recognizes the `n` first examples.
+        The recognition is only run on the examples not yet checked
+        for an AST having the same key.
+
+        Args:
+            ast (RegexpAst): The candidate solution.
+            n (int): The number of examples to check.
+
+        Returns:
+            `True` iff `ast` recognizes `examples[:n]`.
+        """
+        ast_key = ast.key()
+        recognized = map_key_recognized.get(ast_key)
+        if recognized is None:
+            (num_recognized, failed) = (0, False)
+        else:
+            (num_recognized, failed) = recognized
+            map_key_recognized.move_to_end(ast_key)
+        if num_recognized < n and not failed:
+            while num_recognized < n and not failed:
+                if ast.recognizes(examples[num_recognized]):
+                    num_recognized += 1
+                else:
+                    failed = True
+            cache_value(
+                map_key_recognized, ast_key, (num_recognized, failed),
+                objective_cache_size
             )
-        return map_regexp_value[ast_key]
+        return num_recognized >= n
 
     # List to store final results (tuples obj_value, ast)
     final_results = []
@@ -194,7 +470,10 @@ def fast_from_strings(
     i = 0                       # index of current PA
     k = 0                       # current progression in current string
     ast_counter = 0             # ast counter, acts as distinguisher in the pq
-    initial_ast = RegexpAst()   # initial empty ast
+    # The ASTs explored by the search are copies of initial_ast, so they
+    # all share subtree_table, which is released with them.
+    subtree_table = SubtreeTable()
+    initial_ast = RegexpAst(subtree_table)   # initial empty ast
     active_leaf = initial_ast.root
     obj_func_value = 0          # any value would do, will never be compared
 
@@ -202,21 +481,17 @@ def fast_from_strings(
     cbfs_q.push(initial_pq_item, indices_to_depth(i, k))
     ast_counter += 1
 
-    # Main loop
-    t_start = time()
-    while not cbfs_q.is_empty():
-
-        # Check the final condition
-        time_elapsed = time() - t_start
-        if stop_condition(final_results, time_elapsed):
-            # print("stop condition triggered")
-            break
+    def pop_item() -> tuple:
+        """
+        Pops the next item from the CBFS queue and checks whether
+        it is a dead end or a final solution.
 
-        # Get the next item to process from the priority queue
-        # print(cbfs_q.queues[cbfs_q.pop_idx])
+        Returns:
+            The ``(ast, active_leaf, i, j)`` tuple to be expanded
+            if any, ``None`` otherwise.
+        """
         pq_item = cbfs_q.pop()
         obj_func_value, _, ast, active_leaf, i, j = pq_item
-        print(i, j, "___", ast.to_prefix_regexp_str())
         w = (
             examples[i].w if isinstance(examples[i], PatternAutomaton)
             else examples[i]
@@ -232,66 +507,151 @@ def fast_from_strings(
             active_leaf = ast.root
             # Check that the AST still recognizes all
             # the words that have been seen so far
-            if any(
-                not ast.recognizes(example)
-                for example in examples[:i]
-            ):
-                print("bad", ast.to_prefix_regexp_str())
-                ipynb_display_graph(ast)
-                continue  # 'bad' ast. discard and move on
+            if not recognizes_examples(ast, i):
+                visitor.visit_bad_ast(ast)
+                return None  # 'bad' ast. discard and move on
 
         # If we have reach the end of the last example, then the AST is a
         # candidate solution.
-        if i == len(examples) or all(
-            ast.recognizes(example)
-            for example in examples
-        ):
-            print("final", ast.to_prefix_regexp_str(), obj_func_value)
-            ipynb_display_graph(ast)
+        if i == len(examples) or recognizes_examples(ast, len(examples)):
             final_results.append((obj_func_value, ast))
             visitor.visit_final_solution(obj_func_value, ast)
-            continue  # final solution checked and stored, move on
+            return None  # final solution checked and stored, move on
 
         # not end of last example -> consume character and produce children
-        active_leaf_parent = ast.map_node_parent[active_leaf]
-        epsilon_reachable_arcs = ast.epsilon_reachables(
-            active_leaf, active_leaf_parent
+        return (ast, active_leaf, i, j)
+
+    # The children of the AST being expanded, pushed at once in the
+    # CBFS queue by flush_pending (see CBFS.push_many), and the
+    # corresponding visitor events.
+    map_depth_pending = defaultdict(list)
+    pending_push_items = list()
+
+    def flush_pending():
+        """
+        Inserts the pending children in the CBFS queue.
+        """
+        for (depth, pq_items) in map_depth_pending.items():
+            cbfs_q.push_many(pq_items, depth)
+        map_depth_pending.clear()
+        if pending_push_items:
+            visitor.visit_push_items(pending_push_items)
+            pending_push_items.clear()
+
+    def push_mutant(
+        mutator,
+        new_ast: RegexpAst,
+        new_active_leaf: int,
+        i: int,
+        k: int,
+        new_obj_func_value: float = None
+    ) -> bool:
+        """
+        Pushes a (simplified) mutant in the CBFS queue, unless it was already pushed.
+        The mutant is actually inserted in the queue by the next
+        call to ``flush_pending``.
+
+        Args:
+            mutator (Mutator): The mutator that has produced ``new_ast``.
+            new_ast (RegexpAst): The mutant.
+            new_active_leaf (int): The active leaf of ``new_ast``.
+            i (int): The index of the current positive example.
+            k (int): The position reached in the current positive example.
+            new_obj_func_value (float): The objective function value of
+                ``new_ast``, if already computed.
+
+        Returns:
+            ``True`` iff ``new_ast`` has been pushed.
+        """
+        nonlocal ast_counter
+        new_depth = indices_to_depth(i, k)
+        if was_already_pushed(new_ast, new_active_leaf, new_depth):
+            return False
+        if new_obj_func_value is None:
+            new_obj_func_value = compute_objective_value(
+                new_ast, examples
+            )
+        else:
+            ast_key = new_ast.key()
+            if ast_key not in map_regexp_value:
+                cache_objective_value(ast_key, new_obj_func_value)
+        new_pq_item = (
+            new_obj_func_value, ast_counter, new_ast,
+            new_active_leaf, i, k
+        )
+        # print("    pushing %s" % new_ast.to_prefix_regexp_str())
+        map_depth_pending[new_depth].append(new_pq_item)
+        pending_push_items.append((mutator, new_depth, new_pq_item))
+        ast_counter += 1
+        return True
+
+    if num_workers is None:
+        executor = None
+    else:
+        if batch_size is None:
+            batch_size = num_workers
+        executor = ProcessPoolExecutor(
+            num_workers,
+            mp_context=mp_context,
+            initializer=init_worker,
+            initargs=(
+                examples, mutators, mutators_by_kind, objective_function,
+                objective_cache_size
+            )
         )
-        # print("eps reachables: %s" % epsilon_reachable_arcs)
-        num_mutants = 0
-        example = examples[i]
-        for (u, v) in epsilon_reachable_arcs:
-            for mutator in mutators:
-                for (sigma, k) in next_symbols(example, j):
-                    # print("       **", a)
-                    new_depth = indices_to_depth(i, k)
-                    mutated_asts = mutator.mutate(
-                        ast,
-                        sigma,
-                        u,
-                        v,
-                        example.w[:k+1] if isinstance(example, PatternAutomaton) else w[:k],
-                        examples[:i],
-                        epsilon_reachable_arcs,
-                        example
-                    )
-                    num_mutants += len(mutated_asts)
-                    for (new_ast, new_active_leaf) in mutated_asts:
-                        new_ast.simplify()
-                        if was_already_pushed(new_ast, new_active_leaf, new_depth):
-                            continue
-                        new_obj_func_value = compute_objective_value(
-                            new_ast, examples
-                        )
-                        new_pq_item = (
-                            new_obj_func_value, ast_counter, new_ast,
-                            new_active_leaf, i, k
-                        )
-                        # print("    pushing %s" % new_ast.to_prefix_regexp_str())
-                        cbfs_q.push(new_pq_item, new_depth)
-                        visitor.visit_push_item(mutator, new_depth, new_pq_item)
-                        ast_counter += 1
-        print("     generated %s mutants" % num_mutants)
+
+    # Main loop
+    t_start = time()
+    try:
+        while not cbfs_q.is_empty():
+
+            # Check the final condition
+            time_elapsed = time() - t_start
+            if stop_condition(final_results, time_elapsed):
+                # print("stop condition triggered")
+                break
+
+            if executor is None:
+                # Get the next item to process from the priority queue
+                # print(cbfs_q.queues[cbfs_q.pop_idx])
+                task = pop_item()
+                if task is None:
+                    continue
+                (ast, active_leaf, i, j) = task
+                num_pushed = 0
+                for (mutator, new_ast, new_active_leaf, k) in generate_mutants(
+                    ast, active_leaf, i, j, examples, mutators_by_kind,
+                    examples_next_symbols
+                ):
+                    new_ast.simplify()
+                    if push_mutant(mutator, new_ast, new_active_leaf, i, k):
+                        num_pushed += 1
+                        if max_pushes_per_pop is not None and num_pushed >= max_pushes_per_pop:
+                            break
+                flush_pending()
+            else:
+                # Pop a batch of items and expand them in parallel
+                tasks = list()
+                while len(tasks) < batch_size and not cbfs_q.is_empty():
+                    task = pop_item()
+                    if task is not None:
+                        tasks.append(task)
+                for (task, mutants) in zip(tasks, executor.map(expand_in_worker, tasks)):
+                    i = task[2]
+                    num_pushed = 0
+                    for (mutator_idx, new_ast, new_active_leaf, k, new_obj_func_value) in mutants:
+                        new_ast.subtree_table = subtree_table
+                        if push_mutant(
+                            mutators[mutator_idx], new_ast, new_active_leaf,
+                            i, k, new_obj_func_value
+                        ):
+                            num_pushed += 1
+                            if max_pushes_per_pop is not None and num_pushed >= max_pushes_per_pop:
+                                break
+                flush_pending()
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
     return final_results
 
@@ -316,7 +676,7 @@ def fast(
     Returns:
         The found regular expressions.
     """
-    alphabet = set(a for w in examples for a in w)
+    alphabet = set().union(*examples)
     make_obj = [
         make_additive_objective_func_for_str,
         make_multiplicative_objective_func_for_str,
@@ -373,8 +733,11 @@ def fast_from_re(
 
     g = compile_dfa(regexp)
     examples = set()
+    map_q_transitions = dict()  # Shared by all the samplings on g
     while len(examples) < num_examples:
-        w = random_word_from_automaton(g, p_stop_final, repeat, max_sampling)
+        w = random_word_from_automaton(
+            g, p_stop_final, repeat, max_sampling, map_q_transitions
+        )
         examples.add(w)
     print(examples)
 
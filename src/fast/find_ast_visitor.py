@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from time import time
+from time import monotonic, time
+from pybgl.ipynb import ipynb_display_graph
 from .regexp_ast import RegexpAst
 from .regexp_mutators import Mutator
 
@@ -45,6 +46,29 @@ class FindAstFromStringsDefaultVisitor:
         """
         pass
 
+    def visit_push_items(self, push_items: list):
+        """
+        Triggered when the mutants built from a popped mutant
+        are inserted in the priority queue.
+
+        Args:
+            push_items (list): The ``(mutator, new_depth, new_pq_item)``
+                tuples of the pushed mutants
+                (see :py:meth:`visit_push_item`).
+        """
+        for (mutator, new_depth, new_pq_item) in push_items:
+            self.visit_push_item(mutator, new_depth, new_pq_item)
+
+    def visit_bad_ast(self, ast: RegexpAst):
+        """
+        Triggered when a mutant is discarded because it no longer
+        recognizes the positive examples processed so far.
+
+        Args:
+            ast (RegexpAst): The discarded mutant.
+        """
+        pass
+
     def visit_end_sample(self):
         """
         Triggered when a positive example is totally processed.
@@ -74,6 +98,15 @@ class FindAstFromStringsAggregateVisitor(FindAstFromStringsDefaultVisitor):
                 :py:class:`FindAstFromStringsDefaultVisitor` instances.
         """
         self.visitors = visitors
+        # Bind the visitor methods once, as they are triggered for each
+        # popped and pushed mutant.
+        self.on_init_sample = [v.visit_init_sample for v in visitors]
+        self.on_pop_item = [v.visit_pop_item for v in visitors]
+        self.on_push_item = [v.visit_push_item for v in visitors]
+        self.on_push_items = [v.visit_push_items for v in visitors]
+        self.on_bad_ast = [v.visit_bad_ast for v in visitors]
+        self.on_end_sample = [v.visit_end_sample for v in visitors]
+        self.on_final_solution = [v.visit_final_solution for v in visitors]
 
     def visit_init_sample(self, examples):
         """
@@ -82,8 +115,8 @@ class FindAstFromStringsAggregateVisitor(FindAstFromStringsDefaultVisitor):
         Args:
             examples (list): The positive examples.
         """
-        for visitor in self.visitors:
-            visitor.visit_init_sample(examples)
+        for visit in self.on_init_sample:
+            visit(examples)
 
     def visit_pop_item(self, pq_item):
         """
@@ -92,8 +125,8 @@ class FindAstFromStringsAggregateVisitor(FindAstFromStringsDefaultVisitor):
         Args:
             pq_item: The popped mutant.
         """
-        for visitor in self.visitors:
-            visitor.visit_pop_item(pq_item)
+        for visit in self.on_pop_item:
+            visit(pq_item)
 
     def visit_push_item(self, mutator: Mutator, new_depth: int, new_pq_item: tuple):
         """
@@ -105,16 +138,38 @@ class FindAstFromStringsAggregateVisitor(FindAstFromStringsDefaultVisitor):
                 processed characters).
             new_pq_item (tuple): The pushed mutant.
         """
+        for visit in self.on_push_item:
+            visit(mutator, new_depth, new_pq_item)
+
+    def visit_push_items(self, push_items: list):
+        """
+        Triggered when the mutants built from a popped mutant
+        are inserted in the priority queue.
 
-        for visitor in self.visitors:
-            visitor.visit_push_item(mutator, new_depth, new_pq_item)
+        Args:
+            push_items (list): The ``(mutator, new_depth, new_pq_item)``
+                tuples of the pushed mutants.
+        """
+        for visit in self.on_push_items:
+            visit(push_items)
+
+    def visit_bad_ast(self, ast: RegexpAst):
+        """
+        Triggered when a mutant is discarded because it no longer
+        recognizes the positive examples processed so far.
+
+        Args:
+            ast (RegexpAst): The discarded mutant.
+        """
+        for visit in self.on_bad_ast:
+            visit(ast)
 
     def visit_end_sample(self):
         """
         Triggered when a positive example is totally processed.
         """
-        for visitor in self.visitors:
-            visitor.visit_end_sample()
+        for visit in self.on_end_sample:
+            visit()
 
     def visit_final_solution(self, obj_func_value, ast: RegexpAst):
         """
@@ -125,15 +180,16 @@ class FindAstFromStringsAggregateVisitor(FindAstFromStringsDefaultVisitor):
                 candidate solution.
             ast (RegexpAst): The candidate solution.
         """
-        for visitor in self.visitors:
-            visitor.visit_final_solution(obj_func_value, ast)
+        for visit in self.on_final_solution:
+            visit(obj_func_value, ast)
 
 
 # TODO: FromStrings -> FromPas
-# TODO: DebugVisitor
 class FindAstFromStringsVerboseVisitor(FindAstFromStringsDefaultVisitor):
     """
     Insert useful debug message.
+    With ``verbose_level > 3``, the discarded ASTs and the final
+    solutions are also displayed in the notebook (requires graphviz).
     """
     def __init__(self, verbose_level=1):
         self.verbose_level = verbose_level
@@ -146,7 +202,7 @@ class FindAstFromStringsVerboseVisitor(FindAstFromStringsDefaultVisitor):
             examples (list): The positive examples.
         """
         self.num_pops = 0
-        self.time_start = time()
+        self.time_start = monotonic()
 
     def visit_pop_item(self, pq_item: tuple):
         """
@@ -156,8 +212,8 @@ class FindAstFromStringsVerboseVisitor(FindAstFromStringsDefaultVisitor):
             pq_item: The popped mutant.
         """
         self.num_pops += 1
-        time_elapsed = time() - self.time_start
         if self.verbose_level >= 1 and self.num_pops % 100 == 0:
+            time_elapsed = monotonic() - self.time_start
             print(
                 "    [%5d pops (%4.4f pops/s)]" % (
                     self.num_pops,
@@ -191,6 +247,19 @@ class FindAstFromStringsVerboseVisitor(FindAstFromStringsDefaultVisitor):
                 )
             )
 
+    def visit_bad_ast(self, ast: RegexpAst):
+        """
+        Triggered when a mutant is discarded because it no longer
+        recognizes the positive examples processed so far.
+
+        Args:
+            ast (RegexpAst): The discarded mutant.
+        """
+        if self.verbose_level > 1:
+            print("discarding %12s" % ast.to_prefix_regexp_str())
+        if self.verbose_level > 3:
+            ipynb_display_graph(ast)
+
     def visit_final_solution(self, obj_func_value, ast: RegexpAst):
         """
         Triggered when a candidate solution is found.
@@ -200,6 +269,8 @@ class FindAstFromStringsVerboseVisitor(FindAstFromStringsDefaultVisitor):
                 candidate solution.
             ast (RegexpAst): The candidate solution.
         """
+        if self.verbose_level > 3:
+            ipynb_display_graph(ast)
         print(
             "****  Final solution: %s with obj func value of %s  ****" % (
                 ast.to_prefix_regexp_str(), obj_func_value
@@ -252,6 +323,17 @@ class FindAstFromStringsEvaluateVisitor(FindAstFromStringsDefaultVisitor):
         """
         self.num_pushs += 1
 
+    def visit_push_items(self, push_items: list):
+        """
+        Triggered when the mutants built from a popped mutant
+        are inserted in the priority queue.
+
+        Args:
+            push_items (list): The ``(mutator, new_depth, new_pq_item)``
+                tuples of the pushed mutants.
+        """
+        self.num_pushs += len(push_items)
+
     def visit_end_sample(self):
         """
         Triggered when a positive example is totally processed.
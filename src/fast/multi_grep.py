@@ -2,12 +2,143 @@
 # -*- coding: utf-8 -*-
 
 from collections import defaultdict
-from pybgl.automaton import BOTTOM
+from pybgl.automaton import Automaton
+
+
+def compile_dfa_tables(g: Automaton) -> tuple:
+    """
+    Builds the transition table and the set of final states of a DFA.
+
+    Args:
+        g (Automaton): A :py:class:`pybgl.Automaton` instance.
+
+    Returns:
+        A ``(transitions, finals)`` pair where ``transitions[q]`` is
+        the ``dict{a: r}`` of the transitions of the state ``q``, and
+        ``finals`` is the set of final states. If the states of ``g``
+        are ``0, ..., n - 1``, ``transitions`` is a ``list``, otherwise
+        a ``dict``.
+    """
+    states = sorted(g.vertices())
+    transitions = {
+        q: g.m_adjacencies.get(q, dict())
+        for q in states
+    }
+    if states == list(range(len(states))):
+        transitions = [transitions[q] for q in states]
+    finals = {q for q in states if g.is_final(q)}
+    return (transitions, finals)
+
+
+def compile_dfas(map_name_dfa: dict) -> tuple:
+    """
+    Converts a collection of DFAs to a structure of arrays, so that
+    :py:class:`MultiDfa` can iterate over the DFAs by index
+    without calling the :py:class:`Automaton` methods.
+
+    Args:
+        map_name_dfa (dict): A ``dict{Name:  Automaton}`` mapping each pattern
+            name with its corresponding DFA.
+
+    Returns:
+        A ``(names, initials, transitions, finals)`` tuple of lists, where
+        for the ``i``-th DFA, ``names[i]`` is its name, ``initials[i]`` its
+        initial state, ``transitions[i][q][a]`` the ``a``-successor of the
+        state ``q`` (if any), and ``finals[i]`` its set of final states
+        (see :py:func:`compile_dfa_tables`).
+    """
+    names = list()
+    initials = list()
+    transitions = list()
+    finals = list()
+    for (name, g) in map_name_dfa.items():
+        (transitions_g, finals_g) = compile_dfa_tables(g)
+        names.append(name)
+        initials.append(g.initial())
+        transitions.append(transitions_g)
+        finals.append(finals_g)
+    return (names, initials, transitions, finals)
+
+
+class MultiDfa:
+    """
+    The :py:class:`MultiDfa` class is the product of a collection of DFAs,
+    used by :py:func:`multi_grep` to run all the DFAs at once.
+    Each state of the product is identified by an ``int`` and corresponds
+    to the tuple of the states reached in each DFA (``None`` once a DFA
+    has no transition). The states and the transitions are built lazily,
+    as they are traversed, and are kept for the next calls.
+    Hence, passing the same :py:class:`MultiDfa` instance to several
+    :py:func:`multi_grep` calls avoids to rebuild them. The DFAs must not
+    be modified while this :py:class:`MultiDfa` instance is in use.
+    """
+    def __init__(self, map_name_dfa: dict):
+        """
+        Constructor.
+
+        Args:
+            map_name_dfa (dict): A ``dict{Name:  Automaton}`` mapping each
+                pattern name with its corresponding DFA.
+        """
+        (self.names, initials, self.transitions, self.finals) = compile_dfas(
+            map_name_dfa
+        )
+        self.states = list()
+        self.map_state_id = dict()
+        # deltas[p][a] is the (r, indices) pair where r is the a-successor
+        # of p (None if no DFA has a transition), and indices are the
+        # indices of the DFAs whose state is final in r.
+        self.deltas = list()
+        self.initial = self.add_state(tuple(initials))
+
+    def add_state(self, qs: tuple) -> int:
+        """
+        Gets or inserts a state of the product.
+
+        Args:
+            qs (tuple): The states of each DFA.
+
+        Returns:
+            The identifier of the product state.
+        """
+        p = self.map_state_id.get(qs)
+        if p is None:
+            p = self.map_state_id[qs] = len(self.states)
+            self.states.append(qs)
+            self.deltas.append(dict())
+        return p
+
+    def delta(self, p: int, a: str) -> tuple:
+        """
+        Computes (and caches) a transition of the product.
+
+        Args:
+            p (int): The identifier of the product state.
+            a (str): The symbol.
+
+        Returns:
+            The ``(r, indices)`` pair, see ``self.deltas``.
+        """
+        rs = tuple(
+            None if q is None else self.transitions[i][q].get(a)
+            for (i, q) in enumerate(self.states[p])
+        )
+        indices = tuple(
+            i
+            for (i, r) in enumerate(rs)
+            if r is not None and r in self.finals[i]
+        )
+        if all(r is None for r in rs):
+            ret = (None, indices)
+        else:
+            ret = (self.add_state(rs), indices)
+        self.deltas[p][a] = ret
+        return ret
 
 
 def multi_grep(
     w: str,
-    map_name_dfa: list,
+    map_name_dfa: dict,
     callback: callable = lambda name, j, k, w: None,
 ):
     """
@@ -16,41 +147,52 @@ def multi_grep(
     Args:
         w (str): A ``str`` containing the word to process.
         map_name_dfa (dict): A ``dict{Name:  Automaton}`` mapping each pattern
-            name with its corresponding DFA.
+            name with its corresponding DFA, or the corresponding
+            :py:class:`MultiDfa` instance, to be reused across calls.
         callback (callable): A ``callable(Name, int, int, str)`` called whenever
-            ``w[j:k]`` is matched by pattern ``name``.
+            ``w[j:k]`` is matched by pattern ``name``. For a given ``k``,
+            the matches are reported by pattern (in the order of
+            ``map_name_dfa``) and then by increasing ``j``.
     """
-    def make_map_name_q_js_next():
-        return {
-            name:  defaultdict(set)
-            for (name, g) in map_name_dfa.items()
-        }
+    multi_dfa = (
+        map_name_dfa if isinstance(map_name_dfa, MultiDfa)
+        else MultiDfa(map_name_dfa)
+    )
+    names = multi_dfa.names
+    deltas = multi_dfa.deltas
+    p0 = multi_dfa.initial
 
-    m = len(w)
-    map_name_q_js = {
-        name:  {g.initial():  {0}}
-        for (name, g) in map_name_dfa.items()
-    }
+    # Maps each active state p of the product with the bitset js of
+    # indices such that w[j:k] leads from the initial state to p
+    # (the j-th bit of js is set iff j belongs to js).
+    map_p_js = {p0: 1}
 
-    map_name_q_js_next = make_map_name_q_js_next()
-    for k in range(m):
-        a = w[k]
-        for (name, g) in map_name_dfa.items():
-            map_q_js = map_name_q_js[name]
-            for (q, js) in map_q_js.items():
-                if not js:
-                    continue
-                r = g.delta(q, a)
-                if r is BOTTOM:
-                    map_name_q_js_next[name][q] = set()
-                else:
-                    map_name_q_js_next[name][r] |= map_q_js[q]
-                    if g.is_final(r):
-                        for j in js:
-                            callback(name, j, k + 1, w)
-            map_name_q_js_next[name][g.initial()] |= {k + 1}
-        map_name_q_js = map_name_q_js_next
-        map_name_q_js_next = make_map_name_q_js_next()
+    for (k, a) in enumerate(w):
+        map_p_js_next = dict()
+        map_i_js = None
+        for (p, js) in map_p_js.items():
+            ret = deltas[p].get(a)
+            if ret is None:
+                ret = multi_dfa.delta(p, a)
+            (r, indices) = ret
+            if r is None:
+                continue
+            map_p_js_next[r] = map_p_js_next.get(r, 0) | js
+            if indices:
+                if map_i_js is None:
+                    map_i_js = dict()
+                for i in indices:
+                    map_i_js[i] = map_i_js.get(i, 0) | js
+        if map_i_js:
+            for i in sorted(map_i_js):
+                js = map_i_js[i]
+                name = names[i]
+                while js:
+                    lowest = js & -js
+                    callback(name, lowest.bit_length() - 1, k + 1, w)
+                    js ^= lowest
+        map_p_js_next[p0] = map_p_js_next.get(p0, 0) | (1 << (k + 1))
+        map_p_js = map_p_js_next
 
 
 def multi_grep_with_delimiters(
@@ -89,40 +231,44 @@ def multi_grep_with_delimiters(
     functor_delims = MultiGrepFonctorLargest()
     multi_grep(w, map_name_dfa_separator, functor_delims)
 
-    js = {0} | {
-        k
-        for (i, jks) in functor_delims.indices().items()
-        for (j, k) in jks
-    }
-
-    ks = {len(w)} | {
-        j
-        for (i, jks) in functor_delims.indices().items()
-        for (j, k) in jks
-    }
+    # A pattern may start where a separator ends (js), and may end
+    # where a separator starts (ks).
+    js = {0}
+    ks = {len(w)}
+    for jks in functor_delims.indices().values():
+        for (j, k) in jks:
+            js.add(k)
+            ks.add(j)
 
     # multi_grep on other patterns
+    separators = frozenset(
+        name for name in map_name_dfa if is_pattern_separator(name)
+    )
+    left_separated = frozenset(
+        name for name in map_name_dfa if is_pattern_left_separated(name)
+    )
+    right_separated = frozenset(
+        name for name in map_name_dfa if is_pattern_right_separated(name)
+    )
+
     def filtered_callback(name, j, k, w):
-        if is_pattern_separator(name):
+        if name in separators:
             return
-        elif j not in js and is_pattern_left_separated(name):
+        elif j not in js and name in left_separated:
             return
-        elif k not in ks and is_pattern_right_separated(name):
+        elif k not in ks and name in right_separated:
             return
         else:
             callback(name, j, k, w)
 
-    multi_grep(
-        w,
-        map_name_dfa,
-        callback=lambda name, j, k, w: filtered_callback(name, j, k, w)
-    )
+    multi_grep(w, map_name_dfa, callback=filtered_callback)
 
 
 class MultiGrepFonctor:
     """
     Base class used to customize the behavior of the :py:func:`multi_grep` function.
     """
+    __slots__ = ()
 
     def __call__(self, i, j, k, w):
         """
@@ -153,6 +299,8 @@ class MultiGrepFonctorAll(MultiGrepFonctor):
     (for each pattern Pi and for each index j)
     each substring w[j:k] matching Pi.
     """
+    __slots__ = ("map_i_jk",)
+
     def __init__(self):
         self.map_i_jk = defaultdict(list)
 
@@ -169,26 +317,27 @@ class MultiGrepFonctorLargest(MultiGrepFonctor):
     catches (for each pattern Pi and for each index j)
     the largest w[j:k] matching Pi.
     """
+    __slots__ = ("map_ij_k",)
+
     def __init__(self):
-        self.map_i_j_k = defaultdict(lambda: defaultdict(lambda: None))
+        self.map_ij_k = dict()
 
     def __call__(self, i, j, k, w):
-        # As we read w from left to right, k > self.map_pattern_indices[i][j]
-        self.map_i_j_k[i][j] = k
+        # As we read w from left to right, k > self.map_ij_k[(i, j)]
+        self.map_ij_k[(i, j)] = k
 
     def indices(self) -> dict:
-        # Rebuild {i:  [(j, k)]} for each (i, j) pair
+        # Rebuild {i:  [(j, k)]}, keeping for each (i, k) pair the smallest j.
+        map_ik_j = dict()
+        for ((i, j), k) in self.map_ij_k.items():
+            j_ = map_ik_j.get((i, k))
+            if j_ is None or j < j_:
+                map_ik_j[(i, k)] = j
         result = defaultdict(list)
-        for i in self.map_i_j_k:
-            for k in set(self.map_i_j_k[i].values()):
-                result[i] += [(
-                    min(
-                        j for j in self.map_i_j_k[i].keys()
-                        if self.map_i_j_k[i][j] == k
-                    ),
-                    k
-                )]
-            result[i] = sorted(result[i])
+        for ((i, k), j) in map_ik_j.items():
+            result[i].append((j, k))
+        for jks in result.values():
+            jks.sort()
         return result
 
 
@@ -198,12 +347,14 @@ class MultiGrepFonctorGreedy(MultiGrepFonctorLargest):
     catches (for each pattern Pi and for each index j)
     the largest  w[j′:k] matching Pi and s.t.  j′ < j.
     """
+    __slots__ = ("map_ik_j",)
+
     def __init__(self):
         super().__init__()
-        self.map_i_k_j = defaultdict(lambda: defaultdict(lambda: None))
+        self.map_ik_j = dict()
 
     def __call__(self, i, j, k, w):
-        j_ = self.map_i_k_j[i][k]
+        j_ = self.map_ik_j.get((i, k))
         if j_ is None or j < j_:
-            self.map_i_k_j[i][k] = j
+            self.map_ik_j[(i, k)] = j
             super().__call__(i, j, k, w)
@@ -1,11 +1,125 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+from collections import Counter
+from functools import partial
 from .density import ast_density
 from .pattern_automaton import PatternAutomaton
 from .regexp_ast import RegexpAst
 
 
+def examples_to_sizes(examples: list) -> list:
+    """
+    Computes the length of each positive example.
+
+    Args:
+        examples (list): A `list` of `str` and/or
+            :py:class:`PatternAutomaton` instances.
+
+    Returns:
+        The ``list`` of the example lengths.
+    """
+    return [
+        len(example.w) if isinstance(example, PatternAutomaton)
+        else len(example)
+        for example in examples
+    ]
+
+
+def examples_sizes_to_len_proba(examples_sizes: list) -> dict:
+    """
+    Computes the distribution of the lengths of the positive examples.
+
+    Args:
+        examples_sizes (list): The length of each positive example.
+
+    Returns:
+        A ``dict{int: float}`` mapping each length with its frequency.
+    """
+    counts = Counter(examples_sizes)
+    n = len(examples_sizes)
+    return {
+        length: counts[length] / n
+        for length in set(examples_sizes)
+    }
+
+
+def additive_objective_func(
+    ast: RegexpAst,
+    examples: list = None,
+    *,
+    map_len_proba: dict,
+    char_proba: float,
+    map_pa_infix_re: dict,
+    size_factor: float,
+    density_factor: float
+) -> float:
+    """
+    Additive objective function (see
+    :py:func:`make_additive_objective_func_for_str`).
+    """
+    size = ast.num_nodes
+    density = ast_density(ast, map_len_proba, char_proba, map_pa_infix_re)
+    return size_factor * size + density_factor * density
+
+
+def normalized_additive_objective_func(
+    ast: RegexpAst,
+    examples: list = None,
+    *,
+    map_len_proba: dict,
+    char_proba: float,
+    map_pa_infix_re: dict,
+    size_factor: float,
+    density_factor: float,
+    total_examples_size: int
+) -> float:
+    """
+    Normalized additive objective function (see
+    :py:func:`make_normalized_additive_objective_func_for_str`).
+    """
+    size = ast.num_nodes
+    density = ast_density(ast, map_len_proba, char_proba, map_pa_infix_re)
+    return size_factor * (size / total_examples_size) + density_factor * density
+
+
+def multiplicative_objective_func(
+    ast: RegexpAst,
+    examples: list = None,
+    *,
+    map_len_proba: dict,
+    char_proba: float,
+    map_pa_infix_re: dict,
+    size_exponent: float,
+    density_exponent: float
+) -> float:
+    """
+    Multiplicative objective function (see
+    :py:func:`make_multiplicative_objective_func_for_str`).
+    """
+    EPSILON = 1E-6
+    size = ast.num_nodes
+    density = ast_density(ast, map_len_proba, char_proba, map_pa_infix_re)
+    return max(EPSILON, size ** size_exponent) * density ** density_exponent
+
+
+def tuple_based_objective_func(
+    ast: RegexpAst,
+    examples: list = None,
+    *,
+    map_len_proba: dict,
+    char_proba: float,
+    map_pa_infix_re: dict
+) -> tuple:
+    """
+    Lexicographic objective function (see
+    :py:func:`make_tuple_based_objective_func_for_str`).
+    """
+    size = ast.num_nodes
+    density = ast_density(ast, map_len_proba, char_proba, map_pa_infix_re)
+    return (size, density)
+
+
 def make_additive_objective_func_for_str(
     examples: list,
     alphabet: list,
@@ -31,8 +145,11 @@ def make_additive_objective_func_for_str(
     Returns:
         The corresponding `callable(ast, examples) -> float `objective function where
         `ast` is a candidate solution;
-        `examples` is the set of positive examples;
+        `examples` is the set of positive examples, which may be omitted
+        (it is ignored, the `examples` passed to this factory are used instead);
         the returned value is the objective function value given `ast`.
+        It is picklable, hence it can be passed to worker processes
+        (see the ``num_workers`` parameter of :py:func:`fast.fast_from_strings`).
     """
     # TODO Merge size_factor and density_factor
     # examples_sizes = [len(example.w) for example in examples]
@@ -41,22 +158,19 @@ def make_additive_objective_func_for_str(
     #     for length in set(examples_sizes)
     # }
     # max_len = max(examples_sizes)
-    max_len = max(
-        len(example.w) if isinstance(example, PatternAutomaton)
-        else len(example)
-        for example in examples
-    )
+    max_len = max(examples_to_sizes(examples))
     map_len_proba = {
         length: 1 / max_len for length in range(1, max_len + 1)
     }
     char_proba = 1 / len(alphabet)
-
-    def objective_function(ast: RegexpAst, examples: list):
-        size = ast.num_nodes
-        density = ast_density(ast, map_len_proba, char_proba, map_pa_infix_re)
-        return size_factor * size + density_factor * density
-
-    return objective_function
+    return partial(
+        additive_objective_func,
+        map_len_proba=map_len_proba,
+        char_proba=char_proba,
+        map_pa_infix_re=map_pa_infix_re,
+        size_factor=size_factor,
+        density_factor=density_factor
+    )
 
 
 def make_normalized_additive_objective_func_for_str(
@@ -84,31 +198,28 @@ def make_normalized_additive_objective_func_for_str(
     Returns:
         The corresponding `callable(ast, examples) -> float `objective function where
         `ast` is a candidate solution;
-        `examples` is the set of positive examples;
+        `examples` is the set of positive examples, which may be omitted
+        (it is ignored, the `examples` passed to this factory are used instead);
         the returned value is the objective function value given `ast`.
+        It is picklable, hence it can be passed to worker processes
+        (see the ``num_workers`` parameter of :py:func:`fast.fast_from_strings`).
     """
     # TODO Merge size_factor and density_factor
-    examples_sizes = [
-        len(example.w) if isinstance(example, PatternAutomaton)
-        else len(example)
-        for example in examples
-    ]
+    examples_sizes = examples_to_sizes(examples)
 
     # examples_sizes = [len(example.w) for example in examples]
     total_examples_size = sum(examples_sizes) + len(examples_sizes) + 1
-    map_len_proba = {
-        length: examples_sizes.count(length) / len(examples_sizes)
-        for length in set(examples_sizes)
-    }
+    map_len_proba = examples_sizes_to_len_proba(examples_sizes)
     char_proba = 1 / len(alphabet)
-
-    def objective_function(ast: RegexpAst, examples: list):
-        # TODO remove `examples` parameter which is useless
-        size = ast.num_nodes
-        density = ast_density(ast, map_len_proba, char_proba, map_pa_infix_re)
-        return size_factor * (size / total_examples_size) + density_factor * density
-
-    return objective_function
+    return partial(
+        normalized_additive_objective_func,
+        map_len_proba=map_len_proba,
+        char_proba=char_proba,
+        map_pa_infix_re=map_pa_infix_re,
+        size_factor=size_factor,
+        density_factor=density_factor,
+        total_examples_size=total_examples_size
+    )
 
 
 def make_multiplicative_objective_func_for_str(
@@ -136,25 +247,24 @@ def make_multiplicative_objective_func_for_str(
     Returns:
         The corresponding `callable(ast, examples) -> float `objective function where
         `ast` is a candidate solution;
-        `examples` is the set of positive examples;
+        `examples` is the set of positive examples, which may be omitted
+        (it is ignored, the `examples` passed to this factory are used instead);
         the returned value is the objective function value given `ast`.
+        It is picklable, hence it can be passed to worker processes
+        (see the ``num_workers`` parameter of :py:func:`fast.fast_from_strings`).
     """
     # TODO Merge size_exponent and density_exponent
-    EPSILON = 1E-6
-    examples_sizes = [len(example.w) for example in examples]
-    map_len_proba = {
-        length:  examples_sizes.count(length) / len(examples_sizes)
-        for length in set(examples_sizes)
-    }
+    examples_sizes = examples_to_sizes(examples)
+    map_len_proba = examples_sizes_to_len_proba(examples_sizes)
     char_proba = 1 / len(alphabet)
-
-    def objective_function(ast: RegexpAst, examples: list) -> float:
-        # TODO remove `examples` parameter which is useless
-        size = ast.num_nodes
-        density = ast_density(ast, map_len_proba, char_proba, map_pa_infix_re)
-        return max(EPSILON, size ** size_exponent) * density ** density_exponent
-
-    return objective_function
+    return partial(
+        multiplicative_objective_func,
+        map_len_proba=map_len_proba,
+        char_proba=char_proba,
+        map_pa_infix_re=map_pa_infix_re,
+        size_exponent=size_exponent,
+        density_exponent=density_exponent
+    )
 
 
 def make_tuple_based_objective_func_for_str(
@@ -174,20 +284,18 @@ def make_tuple_based_objective_func_for_str(
     Returns:
         The corresponding `callable(ast, examples) -> float `objective function where
         `ast` is a candidate solution;
-        `examples` is the set of positive examples;
+        `examples` is the set of positive examples, which may be omitted
+        (it is ignored, the `examples` passed to this factory are used instead);
         the returned value is the objective function value given `ast`.
+        It is picklable, hence it can be passed to worker processes
+        (see the ``num_workers`` parameter of :py:func:`fast.fast_from_strings`).
     """
-    examples_sizes = [len(example.w) for example in examples]
-    map_len_proba = {
-        length:  examples_sizes.count(length) / len(examples_sizes)
-        for length in set(examples_sizes)
-    }
+    examples_sizes = examples_to_sizes(examples)
+    map_len_proba = examples_sizes_to_len_proba(examples_sizes)
     char_proba = 1 / len(alphabet)
-
-    def objective_function(ast: RegexpAst, examples: list) -> tuple:
-        # TODO remove `examples` parameter which is useless
-        size = ast.num_nodes
-        density = ast_density(ast, map_len_proba, char_proba, map_pa_infix_re)
-        return (size, density)
-
-    return objective_function
+    return partial(
+        tuple_based_objective_func,
+        map_len_proba=map_len_proba,
+        char_proba=char_proba,
+        map_pa_infix_re=map_pa_infix_re
+    )
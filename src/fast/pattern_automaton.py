@@ -2,7 +2,6 @@
 # -*- coding: utf-8 -*-
 
 from collections import defaultdict
-from functools import partial
 from pybgl.automaton import Automaton, EdgeDescriptor
 from pybgl.deterministic_inclusion import deterministic_inclusion
 from pybgl.dijkstra_shortest_paths import dijkstra_shortest_path, make_path
@@ -33,7 +32,8 @@ class PatternAutomaton(Automaton):
         Args:
             word (str): The input word.
             map_name_dfa (dict): A ``dict{str: Automaton}`` mapping each relevant type with its
-                corresponding `Automaton` instance.
+                corresponding `Automaton` instance, or the corresponding
+                :py:class:`MultiDfa` instance (see :py:func:`multi_grep`).
             filtered_patterns (set): A subset (possibly empty) of
                 ``map_name_dfa.keys()`` of type
                 that must be catched my multi_grep, but not reflected as arcs in this
@@ -48,47 +48,54 @@ class PatternAutomaton(Automaton):
             make_mg = MultiGrepFonctorLargest
         mg = make_mg()
 
-        # Add vertices
         n = len(word)
-        super().__init__(n + 1)
-        self.set_final(n)
+        super().__init__()
         self.w = word
+        # Caches the paths computed by pattern_automaton_to_path
+        # for a given map_name_density.
+        self.map_densities_path = dict()
+        # Caches the result of fingerprint().
+        self.arcs_fingerprint = None
 
-        # Add edges
+        # Find the arcs
         multi_grep(word, map_name_dfa, mg)
-        if mg.indices():
+        map_name_jks = mg.indices()
+        if map_name_jks:
+            arcs = list()
             vertices_with_successors = set()
             vertices_with_predecessors = set()
-            for (name, jks) in mg.indices().items():
+            for (name, jks) in map_name_jks.items():
                 if name in filtered_patterns:
                     continue
                 for (j, k) in jks:
-                    self.add_edge(j, k, name)
+                    arcs.append((j, k, name))
                     vertices_with_successors.add(j)
                     vertices_with_predecessors.add(k)
-            to_keep = sorted(vertices_with_successors | vertices_with_predecessors | {0, n})
+            kept = vertices_with_successors.union(vertices_with_predecessors, (0, n))
+            to_keep = sorted(kept)
+        else:
+            # The PatternAutomaton involves a single "any" arc
+            arcs = [(0, n, "any")] if n else list()
+            to_keep = sorted({0, n})
 
-            # Remove isolated vertices
-            for u in range(n):
-                if u not in to_keep:
-                    self.remove_vertex(u)
+        # Add vertices. Vertex u corresponds to index u in word, so isolated
+        # indices are skipped rather than inserted and then removed
+        # (remove_vertex scans every edge of the graph).
+        for u in to_keep:
+            self.m_adjacencies[u] = dict()
+        self.m_id = n + 1
+        self.set_final(n)
 
+        # Add edges
+        for (j, k, name) in arcs:
+            self.add_edge(j, k, name)
+        if map_name_jks:
             # Add missing "any" edges
             for (i, u) in enumerate(to_keep):
                 if u != 0 and u not in vertices_with_predecessors:
                     self.add_edge(to_keep[i-1], u, "any")
                 if u != n and u not in vertices_with_successors:
                     self.add_edge(u, to_keep[i+1], "any")
-        else:
-            # The PatternAutomaton involves a single "any" arc
-            to_remove = set()
-            for u in self.vertices():
-                if u not in {0, n}:
-                    to_remove.add(u)
-            for u in to_remove:
-                self.remove_vertex(u)
-            if len(word):
-                self.add_edge(0, len(word), "any")
 
     def get_slice(self, e) -> tuple:
         """
@@ -119,6 +126,32 @@ class PatternAutomaton(Automaton):
         (j, k) = self.get_slice(e)
         return self.w[j:k]
 
+    def fingerprint(self) -> tuple:
+        """
+        Computes the arcs of this :py:class:`PatternAutomaton` instance,
+        where each vertex is replaced by its rank (the vertices being sorted
+        by index). Two :py:class:`PatternAutomaton` instances having the
+        same fingerprint are equal. The result is cached, so this
+        :py:class:`PatternAutomaton` instance must not be modified afterwards.
+
+        Returns:
+            The sorted ``tuple`` of ``(rank_j, rank_k, label)`` triples.
+        """
+        if self.arcs_fingerprint is None:
+            map_vertex_rank = {
+                u: rank
+                for (rank, u) in enumerate(sorted(self.vertices()))
+            }
+            self.arcs_fingerprint = tuple(sorted(
+                (
+                    map_vertex_rank[self.source(e)],
+                    map_vertex_rank[self.target(e)],
+                    self.label(e)
+                )
+                for e in self.edges()
+            ))
+        return self.arcs_fingerprint
+
     def __eq__(self, pa) -> bool:
         """
         Equality operator. This implementation assumes
@@ -136,6 +169,9 @@ class PatternAutomaton(Automaton):
             # only be equal if they are of same size, because PatternAutomaton are
             # always minimal.
             return False
+        if self.fingerprint() == pa.fingerprint():
+            # Same arcs, up to a renumbering of the vertices.
+            return True
         return deterministic_inclusion(self, pa) == 0
 
 
@@ -156,6 +192,58 @@ def pattern_automaton_edge_weight(
     return map_name_density.get(a, 1.0) if map_name_density else 1.0
 
 
+def pattern_automaton_shortest_paths(
+    g: PatternAutomaton,
+    s: int,
+    t: int,
+    pmap_eweight,
+    pmap_vpreds,
+    pmap_vdist
+) -> bool:
+    """
+    Computes the shortest paths from ``s`` to ``t`` in a
+    :py:class:`PatternAutomaton` instance. As each arc ``(j, k)``
+    satisfies ``j < k``, the vertices are processed by increasing index
+    (a topological order), hence each arc is relaxed once and no
+    priority queue is needed.
+
+    Args:
+        g (PatternAutomaton): The considered :py:class:`PatternAutomaton`
+            instance.
+        s (int): The source vertex.
+        t (int): The target vertex.
+        pmap_eweight (ReadPropertyMap): Maps each edge with its weight.
+        pmap_vpreds (ReadWritePropertyMap): Maps each reached vertex with
+            its set of incident arcs in the shortest paths (each vertex
+            must be initially mapped with ``set()``).
+        pmap_vdist (ReadWritePropertyMap): Maps each reached vertex with
+            the weight of its shortest path from ``s``.
+
+    Returns:
+        ``True`` iff ``t`` is reachable from ``s``.
+    """
+    map_vdist = {s: 0}
+    for u in sorted(g.vertices()):
+        if u < s:
+            continue
+        du = map_vdist.get(u)
+        if du is None:
+            continue
+        pmap_vdist[u] = du
+        if u == t:
+            return True
+        for e in g.out_edges(u):
+            v = g.target(e)
+            dv = du + pmap_eweight[e]
+            dv_ = map_vdist.get(v)
+            if dv_ is None or dv < dv_:
+                map_vdist[v] = dv
+                pmap_vpreds[v] = {e}
+            elif dv == dv_:
+                pmap_vpreds[v].add(e)
+    return False
+
+
 def pattern_automaton_to_path(g: PatternAutomaton, *cls, **kwargs) -> list:
     """
     Extracts from a :py:class:`PatternAutomaton` instance the most relevant
@@ -165,7 +253,17 @@ def pattern_automaton_to_path(g: PatternAutomaton, *cls, **kwargs) -> list:
         g (PatternAutomaton): The considered :py:class:`PatternAutomaton`
             instance.
         cls, kwargs: See the :py:func:`pybgl.dijkstra_shortest_path` function.
+            If no Dijkstra-specific parameter is passed, the path is computed
+            using :py:func:`pattern_automaton_shortest_paths`. If only
+            ``map_name_density`` is passed, the path is cached in ``g``.
     """
+    densities = None
+    if not cls and kwargs.keys() == {"map_name_density"}:
+        densities = frozenset(kwargs["map_name_density"].items())
+        if densities in g.map_densities_path:
+            path = g.map_densities_path[densities]
+            return list(path) if path is not None else None
+
     s = g.initial()
     f = g.finals()
     assert len(f) == 1
@@ -177,25 +275,37 @@ def pattern_automaton_to_path(g: PatternAutomaton, *cls, **kwargs) -> list:
         pmap_vpreds = make_assoc_property_map(map_vpreds)
     pmap_vdist = kwargs.pop("pmap_vdist", None)
     if pmap_vdist is None:
-        map_vdist = dict()
+        map_vdist = defaultdict(int)
         pmap_vdist = make_assoc_property_map(map_vdist)
     pmap_eweight = kwargs.pop("pmap_eweight", None)
     map_name_density = kwargs.pop("map_name_density", None)
     assert pmap_eweight or map_name_density
     if pmap_eweight is None:
+        # Same as pattern_automaton_edge_weight, with the lookups bound once.
+        get_density = map_name_density.get
+        label = g.label
         pmap_eweight = make_func_property_map(
-            partial(
-                pattern_automaton_edge_weight,
-                g=g,
-                map_name_density=map_name_density
-            )
+            lambda e: get_density(label(e), 1.0)
         )
 
-    dijkstra_shortest_path(
+    if cls or kwargs:
+        return dijkstra_shortest_path(
+            g, s, t,
+            pmap_eweight,
+            pmap_vpreds,
+            pmap_vdist,
+            *cls,
+            **kwargs
+        )
+    path = None
+    if pattern_automaton_shortest_paths(
         g, s, t,
         pmap_eweight,
         pmap_vpreds,
-        pmap_vdist,
-        **kwargs
-    )
-    return make_path(g, s, t, map_vpreds)
+        pmap_vdist
+    ):
+        path = make_path(g, s, t, pmap_vpreds)
+    if densities is not None:
+        g.map_densities_path[densities] = path
+        path = list(path) if path is not None else None
+    return path
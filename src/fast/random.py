@@ -3,7 +3,7 @@
 
 from functools import partial
 from random import choice, randrange, random
-from pybgl.automaton import Automaton, EdgeDescriptor
+from pybgl.automaton import Automaton
 from pybgl.shunting_yard_postfix import Ast, MAP_OPERATORS_RE
 
 
@@ -26,17 +26,16 @@ def reject_sampling(
     Returns:
         The sampled instances, ``None`` otherwise.
     """
-    if repeat:
-        if max_sampling:
-            for _ in range(max_sampling):
-                ret = sample()
-                if ret is not None:
-                    break
-        else:
-            ret = None
-            while ret is None:
-                ret = sample()
-    else:
+    if not repeat:
+        return sample()
+    if max_sampling:
+        for _ in range(max_sampling):
+            ret = sample()
+            if ret is not None:
+                return ret
+        return None
+    ret = sample()
+    while ret is None:
         ret = sample()
     return ret
 
@@ -45,7 +44,8 @@ def random_word_from_automaton(
     g: Automaton,
     p: float = 0.5,
     repeat: bool = True,
-    max_sampling: int = 1000
+    max_sampling: int = 1000,
+    map_q_transitions: dict = None
 ) -> str:
     """
     Perform a uniform random walk over an `Automaton` to generate a word accepted
@@ -59,33 +59,46 @@ def random_word_from_automaton(
         max_sampling (int): Max number of reject samplings. If you pass ``None``,
             the algorithm continues until finding a sample, but depending on
             `p` and `g`, this may result to an infinite loop.
+        map_q_transitions (dict): A ``dict`` caching the outgoing
+            ``(target, label)`` pairs of each visited state of ``g``.
+            Pass the same ``dict`` to the calls drawing several words from
+            ``g`` to share it across these calls (``g`` must not be modified
+            in the meantime). Pass ``None`` to only share it among the
+            samplings of this call.
 
     Returns:
         A string representing the word discovered during the walk, or
         ``None`` if the walk led to a non-final state without successor.
     """
-    def find_ith_edge(q: int, i: int, g: Automaton) -> EdgeDescriptor:
-        for e in g.out_edges(q):
-            if i == 0:
-                break
-            i -= 1
-        return e
+    # Maps each visited state with its outgoing (target, label) pairs,
+    # shared by all the samplings.
+    if map_q_transitions is None:
+        map_q_transitions = dict()
+
+    def transitions(q: int) -> tuple:
+        ret = map_q_transitions.get(q)
+        if ret is None:
+            ret = map_q_transitions[q] = tuple(
+                (g.target(e), g.label(e))
+                for e in g.out_edges(q)
+            )
+        return ret
 
     def sample(g, p) -> str:
         q = g.initial()
-        w = ""  # If we stop on q0
+        symbols = list()  # If we stop on q0, the word is empty
         while True:
             r = random()
             if g.is_final(q) and p <= r:
-                return w
-            d = g.out_degree(q)
+                return "".join(symbols)
+            q_transitions = transitions(q)
+            d = len(q_transitions)
             if not d:
                 # Trapped! Reject to avoid biases.
                 return None
             i = randrange(d)
-            e = find_ith_edge(q, i, g)
-            q = g.target(e)
-            w += g.label(e)
+            (q, a) = q_transitions[i]
+            symbols.append(a)
 
     if not 0 <= p < 1:
         raise RuntimeError("p = %s must be a float between 0.0 and 1.0")
@@ -161,31 +174,46 @@ def random_ast(
         A ``tuple(pybgl.shunting_yard_postfix.Ast, int)`` gathering the output AST
         and its root node.
     """
-    def random_ast_rec(re_len: int) -> tuple:
-        if re_len == 1:
-            a = choice(alphabet)
-            root = ast.add_vertex(a)
-        elif re_len == 2:
-            a = choice(alphabet)
-            operator = choice(unary_operators)
-            child = ast.add_vertex(a)
-            root = ast.add_vertex(operator)
-            ast.add_edge(root, child)
-        else:
-            card = choice([1, 2])
-            operator = choice(binary_operators) if card == 2 else choice(unary_operators)
-            root = ast.add_vertex(operator)
-            if card == 2:
-                re_len_left = randrange(1, re_len - 1)
-                re_len_right = re_len - re_len_left - 1
-                root_left = random_ast_rec(re_len_left)
-                root_right = random_ast_rec(re_len_right)
-                ast.add_edge(root, root_left)
-                ast.add_edge(root, root_right)
-            elif card == 1:
-                root_child = random_ast_rec(re_len - 1)
-                ast.add_edge(root, root_child)
-        return root
+    def random_ast_iter(re_len: int) -> int:
+        # Each task is either (re_len,), to build a random subtree of re_len
+        # nodes, or (root, arity), to link root with the roots of the last
+        # arity built subtrees. The random draws, the vertices and the
+        # edges are created in the same order as a recursive descent.
+        tasks = [(re_len,)]
+        roots = list()
+        while tasks:
+            task = tasks.pop()
+            if len(task) == 2:
+                (root, arity) = task
+                for child in roots[-arity:]:
+                    ast.add_edge(root, child)
+                del roots[-arity:]
+                roots.append(root)
+                continue
+            (re_len,) = task
+            if re_len == 1:
+                a = choice(alphabet)
+                roots.append(ast.add_vertex(a))
+            elif re_len == 2:
+                a = choice(alphabet)
+                operator = choice(unary_operators)
+                child = ast.add_vertex(a)
+                root = ast.add_vertex(operator)
+                ast.add_edge(root, child)
+                roots.append(root)
+            else:
+                card = choice([1, 2])
+                operator = choice(binary_operators) if card == 2 else choice(unary_operators)
+                root = ast.add_vertex(operator)
+                tasks.append((root, card))
+                if card == 2:
+                    re_len_left = randrange(1, re_len - 1)
+                    re_len_right = re_len - re_len_left - 1
+                    tasks.append((re_len_right,))
+                    tasks.append((re_len_left,))
+                elif card == 1:
+                    tasks.append((re_len - 1,))
+        return roots[0]
 
     if not alphabet:
         alphabet = list(chr(i) for i in range(ord("a"), ord("z") + 1))
@@ -206,5 +234,5 @@ def random_ast(
                 for (operator, attrs) in map_operators.items()
                 if attrs.cardinality == 2
             ]
-    ast.root = random_ast_rec(re_len)
+    ast.root = random_ast_iter(re_len)
     return ast
@@ -123,6 +123,102 @@ MAP_NAME_RE = {
 }
 
 
+# Caches the DFA compiled by make_dfa for each regular expression.
+MAP_RE_DFA = dict()
+
+
+def minimize_dfa(g: Automaton) -> Automaton:
+    """
+    Minimizes a DFA using the Moore partition refinement algorithm.
+    The states of the resulting DFA are numbered in the order they are
+    discovered by a breadth-first traversal from the initial state
+    (hence the initial state is ``0``).
+
+    Args:
+        g (Automaton): A DFA.
+
+    Returns:
+        The minimal DFA recognizing the same language as ``g``.
+    """
+    states = list(g.vertices())
+    map_q_block = {q: g.is_final(q) for q in states}
+    num_blocks = len(set(map_q_block.values()))
+    while True:
+        map_signature_block = dict()
+        map_q_next_block = {
+            q: map_signature_block.setdefault(
+                (
+                    map_q_block[q],
+                    frozenset(
+                        (a, map_q_block[r])
+                        for (a, r) in g.m_adjacencies.get(q, dict()).items()
+                    )
+                ),
+                len(map_signature_block)
+            )
+            for q in states
+        }
+        map_q_block = map_q_next_block
+        if len(map_signature_block) == num_blocks:
+            break
+        num_blocks = len(map_signature_block)
+
+    # Number the blocks by discovery order and build the minimal DFA.
+    q0 = g.initial()
+    map_block_state = {map_q_block[q0]: 0}
+    to_process = [q0]
+    min_g = Automaton(1)
+    for q in to_process:
+        p = map_block_state[map_q_block[q]]
+        min_g.set_final(p, g.is_final(q))
+        for (a, r) in sorted(g.m_adjacencies.get(q, dict()).items()):
+            block = map_q_block[r]
+            p_r = map_block_state.get(block)
+            if p_r is None:
+                p_r = map_block_state[block] = min_g.add_vertex()
+                to_process.append(r)
+            min_g.add_edge(p, p_r, a)
+    return min_g
+
+
+def copy_dfa(g: Automaton) -> Automaton:
+    """
+    Copies a DFA whose states are ``0, ..., n - 1``
+    (e.g. a DFA built by :py:func:`minimize_dfa`).
+
+    Args:
+        g (Automaton): A DFA.
+
+    Returns:
+        The copy of ``g``.
+    """
+    copy_g = Automaton(g.num_vertices(), g.initial())
+    for q in g.vertices():
+        copy_g.set_final(q, g.is_final(q))
+        for (a, r) in g.m_adjacencies.get(q, dict()).items():
+            copy_g.add_edge(q, r, a)
+    return copy_g
+
+
+def make_dfa(regex: str) -> Automaton:
+    """
+    Builds the minimal DFA corresponding to a regular expression.
+    The DFAs are cached (see ``MAP_RE_DFA``), and each call
+    returns a copy of the cached DFA.
+
+    Args:
+        regex (str): A regular expression supported by
+            :py:func:`pybgl.regexp.compile_dfa`.
+
+    Returns:
+        The corresponding :py:class:`Automaton`.
+    """
+    dfa = MAP_RE_DFA.get(regex)
+    if dfa is None:
+        dfa = MAP_RE_DFA[regex] = minimize_dfa(compile_dfa(regex))
+    return copy_dfa(dfa)
+
+
 def get_pattern_names() -> list:
     """
     Retrieves the list of patterns involved in the default pattern collection.
@@ -147,15 +243,14 @@ def make_map_name_dfa(names: iter = None) -> dict:
 
     Returns:
         The dictionary mapping each pattern name with its
-        corresponding DFA.
+        corresponding DFA (see :py:func:`make_dfa`).
     """
     if not names:
         names = list(MAP_NAME_RE.keys())
     map_name_dfa = dict()
     for name in names:
         try:
-            regex = MAP_NAME_RE[name]
-            map_name_dfa[name] = compile_dfa(regex)
+            map_name_dfa[name] = make_dfa(MAP_NAME_RE[name])
         except Exception as e:
             raise Exception("Error when processing %r: %s" % (name, e))
     return map_name_dfa
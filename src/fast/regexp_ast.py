@@ -1,15 +1,69 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from collections import deque
-from copy import deepcopy
-from pybgl.graph import EdgeDescriptor, to_dot
+from itertools import chain, count, repeat
+from pybgl.graph import to_dot
 from pybgl.graphviz import enrich_kwargs
 from pybgl.property_map import make_func_property_map
 from pybgl.ipynb import ipynb_display_graph
 from .pattern_automaton import PatternAutomaton
 
 
+# Kinds of arcs, see RegexpAst.arc_kind
+ARC_ROOT = "root"
+ARC_DOWN = "down"
+ARC_UP = "up"
+ARC_KINDS = frozenset({ARC_ROOT, ARC_DOWN, ARC_UP})
+
+# Generates the subtree keys. Keys are unique in the process, so two
+# subtrees interned by different SubtreeTable instances never share a key.
+SUBTREE_KEYS = count()
+
+
+class SubtreeTable:
+    """
+    The :py:class:`SubtreeTable` class is the hash-consing table shared by
+    a :py:class:`RegexpAst` instance and all its copies (e.g. all the ASTs
+    explored by a search). It maps a ``(label, child keys)`` pair to a
+    unique ``int``, so that two structurally equal subtrees are assigned
+    to the same key. It also memoizes the string representations of the
+    subtrees, indexed by subtree key (see
+    :py:meth:`RegexpAst.to_prefix_regexp_str`,
+    :py:meth:`RegexpAst.to_prefix_regexp_list` and
+    :py:meth:`RegexpAst.to_infix_regexp_str`), so the strings computed for
+    an AST are reused by all its mutants.
+    It is released together with the ASTs using it.
+    It is not thread-safe, so the ASTs sharing it must be processed
+    by a single thread.
+    """
+    def __init__(self):
+        """
+        Constructor.
+        """
+        self.map_subtree_key = dict()
+        self.map_key_prefix_str = dict()
+        self.map_key_prefix_list = dict()
+        self.map_key_infix_str = dict()
+
+    def intern(self, label: str, child_keys: tuple) -> int:
+        """
+        Retrieves the (hash-consed) key of a subtree.
+
+        Args:
+            label (str): The label of the root of the subtree.
+            child_keys (tuple): The keys of the children of the root of the
+                subtree (see :py:meth:`RegexpAst.subtree_key`).
+
+        Returns:
+            The ``int`` identifying the subtree.
+        """
+        subtree = (label, child_keys)
+        key = self.map_subtree_key.get(subtree)
+        if key is None:
+            key = self.map_subtree_key[subtree] = next(SUBTREE_KEYS)
+        return key
+
+
 class RegexpAst:
     """
     n-ary representations of a regular expression AST.
@@ -17,16 +71,46 @@ class RegexpAst:
     Note that calling simplify transforms an arbitrary AST to a n-ary AST.
     """
     ROOT = "root"  # TODO ROOT = "&perp;"
-
-    def __init__(self):
+    # Labels of the unary and n-ary nodes (see is_unary, is_n_ary, is_leaf),
+    # built once rather than at each call.
+    UNARY_LABELS = frozenset({"+", "*", "?", ROOT})
+    N_ARY_LABELS = frozenset({".", "|"})
+    OPERATOR_LABELS = UNARY_LABELS | N_ARY_LABELS
+    # Default Graphviz style (see to_dot)
+    DOT_DG = {"rankdir": "TB"}
+    DOT_DV = {
+        "shape": "box",
+        "style": "rounded, filled",
+        "ordering": "out"
+    }
+
+    def __init__(self, subtree_table: SubtreeTable = None):
         """
         Constructor.
+
+        Args:
+            subtree_table (SubtreeTable): The table used to compute the
+                subtree keys (see :py:meth:`RegexpAst.subtree_key`), shared
+                with the copies of this AST. Pass ``None`` to use a new one.
         """
+        self.subtree_table = (
+            subtree_table if subtree_table is not None
+            else SubtreeTable()
+        )
         self.num_nodes = 0               # counts the actual number of nodes
         self.nodes_id = 0                # node id for next new node
-        self.map_node_label = dict()     # Maps vertex to its label
-        self.map_node_parent = dict()    # Maps a vertex to its parent node # TODO use defaultdict(lambda: None)
-        self.map_node_children = dict()  # Maps a vertex to its child(ren) (if any) # TODO use defaultdict(list)
+        # The following lists are indexed by vertex descriptor. The slots of
+        # removed vertices are set to None (see remove_node).
+        self.map_node_label = list()     # Maps vertex to its label
+        self.map_node_parent = list()    # Maps a vertex to its parent node
+        self.map_node_children = list()  # Maps a vertex to its child(ren) (if any)
+        self.map_node_index = list()     # Maps a vertex to its index in the children of its parent
+        self.map_node_key = dict()       # Caches the subtree key of each vertex (see subtree_key)
+        self.owned_children = set()      # Vertices whose children list is not shared with a copy (see copy)
+        self.map_arc_successors = dict()  # Caches epsilon_successors, reset whenever this AST is modified
+        self.map_arc_reachables = dict()  # Caches epsilon_reachables, reset whenever this AST is modified
+        self.map_walk_leaves = dict()    # Caches walk_one_char, reset whenever this AST is modified
+        self.dot_str = None              # Caches to_dot() (called without arguments), reset whenever this AST is modified
         # Create a root node
         self.root = self.add_node(label=self.ROOT)
         self.set_child(self.root, None)
@@ -43,9 +127,11 @@ class RegexpAst:
             The newly added vertex descriptor.
         """
         new_node = self.nodes_id
-        self.map_node_label[new_node] = label
-        self.map_node_children[new_node] = []
-        self.map_node_parent[new_node] = None
+        self.map_node_label.append(label)
+        self.map_node_children.append([])
+        self.owned_children.add(new_node)
+        self.map_node_parent.append(None)
+        self.map_node_index.append(None)
         self.nodes_id += 1
         self.num_nodes += 1
         return new_node
@@ -58,11 +144,118 @@ class RegexpAst:
         Args:
             u (int): The vertex descriptor of the node to be removed.
         """
-        del self.map_node_label[u]
-        del self.map_node_parent[u]
-        del self.map_node_children[u]
+        self.map_node_label[u] = None
+        self.map_node_parent[u] = None
+        self.map_node_children[u] = None
+        self.map_node_index[u] = None
+        self.owned_children.discard(u)
+        self.map_node_key.pop(u, None)
         self.num_nodes -= 1
 
+    def __getstate__(self) -> dict:
+        """
+        Prepares this :py:class:`RegexpAst` instance for pickling.
+        The subtree keys are only meaningful for the current
+        :py:class:`SubtreeTable`, so they are dropped together with this
+        table, as well as the cached walks. The unpickled instance
+        uses a new :py:class:`SubtreeTable`.
+
+        Returns:
+            The state of this :py:class:`RegexpAst` instance.
+        """
+        state = self.__dict__.copy()
+        state["subtree_table"] = None
+        state["map_node_key"] = dict()
+        state["owned_children"] = set()
+        state["map_arc_successors"] = dict()
+        state["map_arc_reachables"] = dict()
+        state["map_walk_leaves"] = dict()
+        return state
+
+    def __setstate__(self, state: dict):
+        """
+        Restores a pickled :py:class:`RegexpAst` instance
+        (see :py:meth:`RegexpAst.__getstate__`).
+
+        Args:
+            state (dict): The state of the pickled instance.
+        """
+        self.__dict__.update(state)
+        self.subtree_table = SubtreeTable()
+
+    def own_children(self, u: int) -> list:
+        """
+        Retrieves the children list of a node, to be modified in place.
+        If this list is shared with another :py:class:`RegexpAst` instance
+        (see :py:meth:`RegexpAst.copy`), it is copied first.
+
+        Args:
+            u (int): The vertex descriptor of the considered node.
+
+        Returns:
+            The children list of ``u``, owned by this instance.
+        """
+        if u not in self.owned_children:
+            self.map_node_children[u] = list(self.map_node_children[u])
+            self.owned_children.add(u)
+        return self.map_node_children[u]
+
+    def invalidate_key(self, u: int):
+        """
+        Invalidates the cached subtree keys of a node and of its ancestors,
+        as well as the cached walks (see :py:meth:`RegexpAst.epsilon_successors`,
+        :py:meth:`RegexpAst.epsilon_reachables` and
+        :py:meth:`RegexpAst.walk_one_char`) and Graphviz export
+        (see :py:meth:`RegexpAst.to_dot`).
+        It must be called whenever the subtree rooted in ``u`` is modified.
+
+        Args:
+            u (int): The vertex descriptor of the modified node.
+        """
+        if self.map_arc_successors or self.map_arc_reachables:
+            self.map_arc_successors = dict()
+            self.map_arc_reachables = dict()
+            self.map_walk_leaves = dict()
+        self.dot_str = None
+        while u is not None:
+            self.map_node_key.pop(u, None)
+            u = self.map_node_parent[u]
+
+    def subtree_key(self, u: int) -> int:
+        """
+        Retrieves the key of the subtree rooted in a given node.
+        Two subtrees get the same key iff they are structurally equal
+        (same labels, same children order). Keys are cached and only
+        the nodes modified since the last call are rehashed.
+
+        Args:
+            u (int): The vertex descriptor of the considered node.
+
+        Returns:
+            The ``int`` identifying the subtree rooted in ``u``.
+        """
+        key = self.map_node_key.get(u)
+        if key is None:
+            key = self.subtree_table.intern(
+                self.map_node_label[u],
+                tuple(
+                    None if v is None else self.subtree_key(v)
+                    for v in self.map_node_children[u]
+                )
+            )
+            self.map_node_key[u] = key
+        return key
+
+    def key(self) -> int:
+        """
+        Retrieves the key of this :py:class:`RegexpAst` instance.
+        See also :py:meth:`RegexpAst.subtree_key`.
+
+        Returns:
+            The ``int`` identifying this :py:class:`RegexpAst` instance.
+        """
+        return self.subtree_key(self.root)
+
     def is_downwards_arc(self, u: int, v: int) -> bool:
         """
         Checks whether an ``(u, v)`` arc is downward
@@ -77,6 +270,24 @@ class RegexpAst:
         """
         return self.map_node_parent[v] == u
 
+    def arc_kind(self, u: int, v: int) -> str:
+        """
+        Classifies an ``(u, v)`` arc.
+
+        Args:
+            u (int): The vertex descriptor of the source of the arc.
+            v (int): The vertex descriptor of the target of the arc
+                (possibly ``None``).
+
+        Returns:
+            :py:data:`ARC_ROOT` if ``v`` is ``None``,
+            :py:data:`ARC_DOWN` if ``(u, v)`` is downward,
+            :py:data:`ARC_UP` otherwise.
+        """
+        if v is None:
+            return ARC_ROOT
+        return ARC_DOWN if self.map_node_parent[v] == u else ARC_UP
+
     def is_upwards_arc(self, u: int, v: int) -> bool:
         """
         Checks whether an ``(u, v)`` arc is upward
@@ -104,7 +315,7 @@ class RegexpAst:
         Returns:
             ``True`` iff ``u`` is unary, ``False`` otherwise.
         """
-        return self.map_node_label[u] in {"+", "*", "?", self.ROOT}
+        return self.map_node_label[u] in self.UNARY_LABELS
 
     # TODO why not using len(self.map_node_children) > 1 ?
     def is_n_ary(self, u: int) -> bool:
@@ -119,7 +330,7 @@ class RegexpAst:
         Returns:
             ``True`` iff ``u`` is ``n``-ary, ``False`` otherwise.
         """
-        return self.map_node_label[u] in {".", "|"}
+        return self.map_node_label[u] in self.N_ARY_LABELS
 
     # TODO why not using len(self.map_node_children) == 0 ?
     def is_leaf(self, u: int) -> bool:
@@ -133,13 +344,16 @@ class RegexpAst:
         Returns:
             ``True`` iff ``u`` is a leaf, ``False`` otherwise.
         """
-        return not self.is_n_ary(u) and not self.is_unary(u)
+        return self.map_node_label[u] not in self.OPERATOR_LABELS
 
     def get_arc_index(self, u: int, v: int) -> int:
         """If (u,v) is downwards, and v is the i^th child of u, returns i.
         If (u,v) is upwards, and u is the i^th child of v, returns i."""
-        if self.is_upwards_arc(u, v):
-            return self.get_arc_index(v, u)
+        map_node_parent = self.map_node_parent
+        if map_node_parent[u] == v:
+            return self.map_node_index[u]
+        if v is not None and map_node_parent[v] == u:
+            return self.map_node_index[v]
         return self.map_node_children[u].index(v)
 
     def label(self, u) -> str:
@@ -163,6 +377,7 @@ class RegexpAst:
             label (str): Set the label of a given node.
         """
         self.map_node_label[u] = label
+        self.invalidate_key(u)
 
     def parent(self, u: int) -> int:
         """
@@ -244,8 +459,11 @@ class RegexpAst:
                 Defaults to ``True``.
         """
         self.map_node_children[u] = [v]
-        if set_parent:
+        self.owned_children.add(u)
+        if set_parent and v is not None:
             self.map_node_parent[v] = u
+            self.map_node_index[v] = 0
+        self.invalidate_key(u)
 
     def set_children(self, u: int, vs: iter, set_parents: bool = True):
         """
@@ -258,9 +476,12 @@ class RegexpAst:
                 Defaults to ``True``.
         """
         self.map_node_children[u] = vs
+        self.owned_children.discard(u)
         if set_parents:
-            for v in vs:
+            for (i, v) in enumerate(vs):
                 self.map_node_parent[v] = u
+                self.map_node_index[v] = i
+        self.invalidate_key(u)
 
     def set_ith_child(self, u: int, v: int, i: int, set_parent: bool = True):
         """
@@ -277,9 +498,12 @@ class RegexpAst:
         Raises:
             `IndexError` if ``not (0 < i <= self.num_children(u))``
         """
-        self.map_node_children[u][i] = v
+        u_children = self.own_children(u)
+        u_children[i] = v
         if set_parent:
             self.map_node_parent[v] = u
+            self.map_node_index[v] = i if i >= 0 else len(u_children) + i
+        self.invalidate_key(u)
 
     def append_child(self, u: int, v: int, set_parent: bool = True):
         """
@@ -291,9 +515,12 @@ class RegexpAst:
             set_parent (bool): Pass ``True`` to update the parent of ``v``.
                 Defaults to ``True``.
         """
-        self.map_node_children[u].append(v)
+        u_children = self.own_children(u)
+        u_children.append(v)
         if set_parent:
             self.map_node_parent[v] = u
+            self.map_node_index[v] = len(u_children) - 1
+        self.invalidate_key(u)
 
     def num_children(self, u: int) -> int:
         """
@@ -318,15 +545,15 @@ class RegexpAst:
         Returns:
             ``True`` iff ``v`` is an ancestor of ``u``, ``False`` otherwise.
         """
-        # TODO we should use self.map_parent
-        if self.is_leaf(u):
-            return u == v
-        elif self.is_unary(u):
-            return self.is_ancestor_of(self.first_child(u), v)
-        elif self.is_n_ary(u):
-            return any(
-                self.is_ancestor_of(u_child, v) for u_child in self.children(u)
-            )
+        # Only the leaves of the subtree rooted in u are considered.
+        if v is None or not self.is_leaf(v):
+            return False
+        map_node_parent = self.map_node_parent
+        while v is not None:
+            if v == u:
+                return True
+            v = map_node_parent[v]
+        return False
 
     def epsilon_successors(self, u: int, v: int) -> set:
         """
@@ -340,13 +567,18 @@ class RegexpAst:
 
         Returns:
             The set of out-edges of ``(u', v')`` arcs that are
-            epsilon-reachable from the ``(u, v)`` arc
+            epsilon-reachable from the ``(u, v)`` arc. This set is cached
+            until this :py:class:`RegexpAst` instance is modified, so it
+            must not be modified.
         """
         if v is None:
             assert u == self.root
             return {(u, self.first_child(u))}
 
         # print("**", u, v, self.map_node_parent[u], self.map_node_parent[v])
+        result = self.map_arc_successors.get((u, v))
+        if result is not None:
+            return result
         result = set()
         result.add((u, v))
         v_label = self.label(v)
@@ -383,6 +615,7 @@ class RegexpAst:
             # case v is root -> no eps successors
             # case v is leaf impossible
         # print("**", result)
+        self.map_arc_successors[(u, v)] = result
         return result
 
     def epsilon_reachables(self, u: int, v: int = None) -> set:
@@ -398,21 +631,27 @@ class RegexpAst:
 
         Returns:
             The set of out-edges of ``(u', v')`` arcs that are
-            epsilon-reachable from the ``(u, v)`` arc
+            epsilon-reachable from the ``(u, v)`` arc. This set is cached
+            until this :py:class:`RegexpAst` instance is modified, so it
+            must not be modified.
         """
         # print("eps reach", u, v)
-        result = set()
-        stack = deque()
-        result.add((u, v))
-        stack.append((u, v))
-        while len(stack) > 0:
+        result = self.map_arc_reachables.get((u, v))
+        if result is not None:
+            return result
+        # The arcs returned by epsilon_successors are stored as is,
+        # rather than unpacked and rebuilt.
+        arc = (u, v)
+        result = {arc}
+        stack = [arc]
+        epsilon_successors = self.epsilon_successors
+        while stack:
             (u, v) = stack.pop()
-            # print("__", u, v)
-            for (uu, vv) in self.epsilon_successors(u, v):
-                if (uu, vv) not in result:
-                    # print("___adding___", uu, vv)
-                    result.add((uu, vv))
-                    stack.append((uu, vv))
+            for successor in epsilon_successors(u, v):
+                if successor not in result:
+                    result.add(successor)
+                    stack.append(successor)
+        self.map_arc_reachables[arc] = result
         return result
 
     def to_prefix_regexp_str(self, u: int = None) -> str:
@@ -432,15 +671,34 @@ class RegexpAst:
             u = self.first_child(self.root)
             if u is None:
                 return ""
+        return self.prefix_regexp_str(u)
+
+    def prefix_regexp_str(self, u: int) -> str:
+        """
+        Memoized implementation of :py:meth:`RegexpAst.to_prefix_regexp_str`.
+
+        Args:
+            u (int): The vertex descriptor of the root of the considered subtree.
+
+        Returns:
+            The prefix regular expression of the subtree rooted in ``u``.
+        """
+        key = self.subtree_key(u)
+        map_key_prefix_str = self.subtree_table.map_key_prefix_str
+        result = map_key_prefix_str.get(key)
+        if result is not None:
+            return result
         u_label = self.label(u)
         if self.is_n_ary(u):
-            return u_label + '(' + ','.join(
-                [self.to_prefix_regexp_str(v) for v in self.children(u)]
+            result = u_label + '(' + ','.join(
+                [self.prefix_regexp_str(v) for v in self.children(u)]
             ) + ')'
         elif self.is_unary(u):
-            return u_label + self.to_prefix_regexp_str(self.first_child(u))
+            result = u_label + self.prefix_regexp_str(self.first_child(u))
         else:  # u is a leaf
-            return u_label
+            result = u_label
+        map_key_prefix_str[key] = result
+        return result
 
     def to_prefix_regexp_list(self, u: int = None) -> list:
         """
@@ -459,20 +717,40 @@ class RegexpAst:
             u = self.first_child(self.root)
             if u is None:
                 return []
+        return list(self.prefix_regexp_tuple(u))
+
+    def prefix_regexp_tuple(self, u: int) -> tuple:
+        """
+        Memoized implementation of :py:meth:`RegexpAst.to_prefix_regexp_list`.
+
+        Args:
+            u (int): The vertex descriptor of the root of the considered subtree.
+
+        Returns:
+            The ``tuple`` of tokens of the prefix regular expression
+            of the subtree rooted in ``u``.
+        """
+        key = self.subtree_key(u)
+        map_key_prefix_list = self.subtree_table.map_key_prefix_list
+        result = map_key_prefix_list.get(key)
+        if result is not None:
+            return result
         u_label = self.label(u)
         if self.is_n_ary(u):
             result = [u_label, '(']
             for v in self.children(u):
                 if not v == self.first_child(u):
-                    result += [',']
-                result += self.to_prefix_regexp_list(v)
-            result += [')']
-            return result
+                    result.append(',')
+                result.extend(self.prefix_regexp_tuple(v))
+            result.append(')')
+            result = tuple(result)
         elif self.is_unary(u):
-            return [u_label] \
-                + self.to_prefix_regexp_list(self.map_node_children[u][0])
+            result = (u_label,) \
+                + self.prefix_regexp_tuple(self.map_node_children[u][0])
         else:  # u is a leaf
-            return [u_label]
+            result = (u_label,)
+        map_key_prefix_list[key] = result
+        return result
 
     def to_infix_regexp_str(self, u=None) -> str:
         """
@@ -490,113 +768,150 @@ class RegexpAst:
         if u is None:
             u = self.first_child(self.root)
             if u is None:
-                result = ""
+                return ""
+        result = self.infix_regexp_str(u)
+        if u == self.first_child(self.root):
+            if result[0] == '(' and result[-1] == ')':
+                result = result[1:-1]
+        return result
+
+    def infix_regexp_str(self, u: int) -> str:
+        """
+        Memoized implementation of :py:meth:`RegexpAst.to_infix_regexp_str`,
+        without removing the outer parenthesis.
+
+        Args:
+            u (int): The vertex descriptor of the root of the considered subtree.
+
+        Returns:
+            The infix regular expression of the subtree rooted in ``u``.
+        """
+        key = self.subtree_key(u)
+        map_key_infix_str = self.subtree_table.map_key_infix_str
+        result = map_key_infix_str.get(key)
+        if result is not None:
+            return result
         u_label = self.label(u)
         if self.is_n_ary(u):
-            result = '(' * (len(self.children(u)) - 1) + u_label.join(
-                [self.to_infix_regexp_str(v) + (')' if i > 0 else "")
-                 for i, v in enumerate(self.children(u))]
-            )
+            # e.g. "((a.b).c)" for a "." node having 3 children.
+            # The pieces are gathered in a list and joined once.
+            vs = self.children(u)
+            buf = ['(' * (len(vs) - 1)]
+            for (i, v) in enumerate(vs):
+                if i > 0:
+                    buf += (u_label, self.infix_regexp_str(v), ')')
+                else:
+                    buf.append(self.infix_regexp_str(v))
+            result = "".join(buf)
         elif self.is_unary(u):
-            child_is_leaf = self.is_leaf(self.first_child(u))
-            result = ("" if child_is_leaf else "(") \
-                + self.to_infix_regexp_str(self.first_child(u)) \
-                + ("" if child_is_leaf else ")") + u_label
+            v = self.first_child(u)
+            result = (
+                "".join((self.infix_regexp_str(v), u_label)) if self.is_leaf(v)
+                else "".join(('(', self.infix_regexp_str(v), ')', u_label))
+            )
         else:  # u is a leaf
             result = u_label
-        if u == self.first_child(self.root):
-            if result[0] == '(' and result[-1] == ')':
-                result = result[1:-1]
+        map_key_infix_str[key] = result
         return result
 
     def copy(self):
         """
         Copy this :py:class:`RegexpAst` instance.
+        The children lists are shared between the two instances until
+        one of them modifies them (copy-on-write, see
+        :py:meth:`RegexpAst.own_children`), so the copy only costs
+        a few shallow ``list`` copies.
 
         Returns:
             A copy this :py:class:`RegexpAst` instance.
         """
-        return deepcopy(self)
+        ast = self.__class__.__new__(self.__class__)
+        ast.__dict__.update(self.__dict__)
+        ast.map_node_label = self.map_node_label.copy()
+        ast.map_node_parent = self.map_node_parent.copy()
+        ast.map_node_children = self.map_node_children.copy()
+        ast.map_node_index = self.map_node_index.copy()
+        ast.map_node_key = self.map_node_key.copy()
+        ast.map_arc_successors = dict()
+        ast.map_arc_reachables = dict()
+        ast.map_walk_leaves = dict()
+        ast.owned_children = set()
+        self.owned_children = set()
+        return ast
 
     def simplify(self, active_leaf: int = None):
         """
         Applies the following simplifications on this :py:class:`RegexpAst` instance.
 
-        - :py:meth:`RegexpAst.simplify_unary_nodes`
-        - :py:meth:`RegexpAst.simplify_n_ary_nodes`
+        - :py:meth:`RegexpAst.simplify_unary_and_n_ary_nodes`
         - :py:meth:`RegexpAst.reorder_or_nodes`
         - :py:meth:`remove_unary_n_aries`
 
         Args:
             active_leaf (int): Pass `None`
         """
-        self.simplify_unary_nodes()  # ++ -> + ; ?? -> ? ,; ?+ -> * etc.
-        self.simplify_n_ary_nodes()  # (a.b).c -> (a.b.c)
+        self.simplify_unary_and_n_ary_nodes()  # ++ -> + ; ?? -> ? ,; ?+ -> * etc. and (a.b).c -> (a.b.c)
         self.reorder_or_nodes()      # b|a -> a|b
         # self.simplify_or_nodes(active_leaf=active_leaf) # MANDO: a | a -> a. Be cautious, do not remove if a is the source of the active arc.
         self.remove_unary_n_aries()  # When inserting unary node, some binary node may get only one operand and hence become useless. We just remove the useless operator. |a -> a ; .a -> a
 
-    def simplify_unary_nodes(self, u=None):
-        # print("8______start")
-        # print(u)
-        # ipynb_display_graph(self)
-        # print("8______end")
+    def simplify_unary_and_n_ary_nodes(self, u=None):
+        """
+        Simplifies, in a single traversal, the unary nodes having
+        a unary child (e.g. ``++`` -> ``+``, ``??`` -> ``?``, ``?+`` -> ``*``)
+        and the n-ary nodes having a child with the same label
+        (e.g. ``(a.b).c`` -> ``a.b.c``).
+        Both rewritings only involve a node and its children, and neither
+        of them creates a pattern handled by the other one, so the
+        result is the same as performing them in two successive passes.
+
+        Args:
+            u (int): Pass ``None``.
+        """
         if u is None:
             u = self.first_child(self.root)
             if u is None:
                 return
 
-        if self.is_n_ary(u):
-            for v in self.children(u):
-                self.simplify_unary_nodes(v)
-
-        elif self.is_unary(u):
-            v = self.first_child(u)
-            if self.is_unary(v):
+        # Depth-first traversal, using an explicit stack.
+        stack = [u]
+        while stack:
+            u = stack.pop()
+            if self.is_unary(u):
+                v = self.first_child(u)
+                if self.is_unary(v):
+                    if self.label(u) != self.label(v):
+                        self.set_label(u, "*")
+                    # remove v
+                    self.set_child(u, self.first_child(v))
+                    self.remove_node(v)
+                    stack.append(u)
+                else:
+                    stack.append(v)
+            elif self.is_n_ary(u):
                 u_label = self.label(u)
-                v_label = self.label(v)
-                if u_label != v_label:
-                    self.set_label(u, "*")
-                # remove v
-                v_child = self.first_child(v)
-                self.set_child(u, v_child)
-                self.remove_node(v)
-                self.simplify_unary_nodes(u)
-            else:
-                self.simplify_unary_nodes(v)
+                for v in self.children(u):
+                    if self.label(v) == u_label:
+                        self.merge_n_ary_nodes(u, v)
+                        stack.append(u)
+                        break
+                else:
+                    stack.extend(reversed(self.children(u)))
 
     def merge_n_ary_nodes(self, u, v, remove_v=True):
         i = self.get_arc_index(u, v)
-        self.map_node_children[u] = self.map_node_children[u][:i] \
-            + self.map_node_children[v] + self.map_node_children[u][i+1:]
+        # Splice the children of v in place of v.
+        self.own_children(u)[i:i + 1] = self.map_node_children[v]
         for v_child in self.children(v):
             self.map_node_parent[v_child] = u
+        # The children of u from index i have been shifted.
+        map_node_index = self.map_node_index
+        for (j, w) in enumerate(self.map_node_children[u][i:], i):
+            map_node_index[w] = j
+        self.invalidate_key(u)
         if remove_v:
             self.remove_node(v)
 
-    def simplify_n_ary_nodes(self, u=None):
-        if u is None:
-            u = self.first_child(self.root)
-            if u is None:
-                return
-        if self.is_unary(u):
-            self.simplify_n_ary_nodes(self.first_child(u))
-
-        elif self.is_n_ary(u):
-            u_label = self.label(u)
-            has_merged = False
-            for i, v in enumerate(self.children(u)):
-                v_label = self.label(v)
-                if u_label == v_label:
-                    self.merge_n_ary_nodes(u, v)
-                    has_merged = True
-                    break
-            if has_merged:
-                self.simplify_n_ary_nodes(u)
-            else:
-                for v in self.children(u):
-                    self.simplify_n_ary_nodes(v)
-
     # UNUSED
     def simplify_or_nodes(self, active_leaf=None, u=None):
         if u is None:
@@ -605,16 +920,16 @@ class RegexpAst:
                 return
 
         if self.is_unary(u):
-            self.simplify_or_nodes(self.first_child(u))
+            self.simplify_or_nodes(active_leaf, self.first_child(u))
 
         elif self.is_n_ary(u):
             for v in self.children(u):
-                self.simplify_or_nodes(v)
+                self.simplify_or_nodes(active_leaf, v)
             if self.label(u) == "|":
                 children_prefixes = dict()
                 to_remove = set()
                 for v in self.children(u):
-                    v_prefix = self.to_prefix_regexp_str(v)
+                    v_prefix = self.prefix_regexp_str(v)
                     if v_prefix in children_prefixes:
                         if self.is_ancestor_of(v, active_leaf):
                             to_remove.add(children_prefixes[v_prefix])
@@ -631,17 +946,28 @@ class RegexpAst:
             if u is None:
                 return
 
-        if self.is_unary(u):
-            self.reorder_or_nodes(self.first_child(u))
-
-        elif self.is_n_ary(u):
-            for v in self.children(u):
-                self.reorder_or_nodes(v)
-            if self.label(u) == "|":
-                self.map_node_children[u] = sorted(
-                    self.map_node_children[u],
-                    key=lambda v: self.to_prefix_regexp_str(v)
-                )
+        # Post-order traversal, using an explicit stack: a "|" node
+        # is reordered once all its children have been processed.
+        stack = [(u, False)]
+        while stack:
+            (u, children_done) = stack.pop()
+            if self.is_unary(u):
+                stack.append((self.first_child(u), False))
+            elif self.is_n_ary(u):
+                if not children_done:
+                    stack.append((u, True))
+                    stack.extend((v, False) for v in reversed(self.children(u)))
+                elif self.label(u) == "|":
+                    # The prefix strings are memoized per subtree key, and
+                    # the keys are only invalidated if the order changes.
+                    vs = self.map_node_children[u]
+                    sorted_vs = sorted(vs, key=self.prefix_regexp_str)
+                    if sorted_vs != vs:
+                        self.map_node_children[u] = sorted_vs
+                        self.owned_children.add(u)
+                        for (i, v) in enumerate(sorted_vs):
+                            self.map_node_index[v] = i
+                        self.invalidate_key(u)
 
     def find_unary_n_aries(self, u=None):
         if u is None:
@@ -666,20 +992,22 @@ class RegexpAst:
             if u is None:
                 return
 
-        if self.is_unary(u):
-            self.remove_unary_n_aries(self.first_child(u))
-
-        elif self.is_n_ary(u):
-            if len(self.children(u)) == 1:
-                u_parent = self.parent(u)
-                i = self.get_arc_index(u_parent, u)
-                u_child = self.first_child(u)
-                self.set_ith_child(u_parent, u_child, i)
-                self.remove_node(u)
-                self.remove_unary_n_aries(u_child)
-            else:
-                for v in self.children(u):
-                    self.remove_unary_n_aries(v)
+        # Depth-first traversal, using an explicit stack.
+        stack = [u]
+        while stack:
+            u = stack.pop()
+            if self.is_unary(u):
+                stack.append(self.first_child(u))
+            elif self.is_n_ary(u):
+                if len(self.children(u)) == 1:
+                    u_parent = self.parent(u)
+                    i = self.get_arc_index(u_parent, u)
+                    u_child = self.first_child(u)
+                    self.set_ith_child(u_parent, u_child, i)
+                    self.remove_node(u)
+                    stack.append(u_child)
+                else:
+                    stack.extend(reversed(self.children(u)))
 
     def walk_one_char(self, u: int, a: str, verbose: bool = False) -> set:
         """
@@ -690,8 +1018,12 @@ class RegexpAst:
 
         Args:
             a (str): A symbol, e.g. "a" or "$date".
+
+        Returns:
+            The set of reached leaves. This set is cached until this
+            :py:class:`RegexpAst` instance is modified, so it must not be
+            modified.
         """
-        result = set()
         v = self.parent(u)  # if u is root, v will be None
         if verbose:
             print("5_____start")
@@ -699,10 +1031,15 @@ class RegexpAst:
             print(u, v)
             print(a)
             print("5______end")
+        result = self.map_walk_leaves.get((u, a))
+        if result is not None:
+            return result
+        result = set()
         epsilon_reachables = self.epsilon_reachables(u, v)
         for uu, vv in epsilon_reachables:
             if vv is not None and self.label(vv) == a:
                 result.add(vv)
+        self.map_walk_leaves[(u, a)] = result
         return result
 
     def walk_word(self, w: list, u: int = None) -> set:
@@ -722,11 +1059,15 @@ class RegexpAst:
         if u is None:
             u = self.root
         possible_locations = {u}
+        walk_one_char = self.walk_one_char
         for a in w:
-            new_possible_locations = set()
-            for leaf in possible_locations:
-                new_possible_locations |= self.walk_one_char(leaf, a)
-            possible_locations = new_possible_locations
+            possible_locations = set().union(*(
+                walk_one_char(leaf, a)
+                for leaf in possible_locations
+            ))
+            if not possible_locations:
+                # No leaf can consume the rest of w.
+                break
         return possible_locations
 
     def recognizes(self, x) -> bool:
@@ -740,9 +1081,9 @@ class RegexpAst:
         # With str: is there a path from bot to bot recognizing an arbirary word.
         # With PAs: is there a path from bot to bot recognizing a path from the source
         #     to the sink of the PA.
-        stack = deque()
-        u = self.root
-        stack.append((u, 0))
+        # Each (leaf, PA vertex) pair is explored at most once.
+        stack = [(self.root, 0)]
+        visited = set(stack)
         while stack:
             (u, q) = stack.pop()
             if pa.is_final(q):
@@ -759,7 +1100,9 @@ class RegexpAst:
                 p = pa.label(e)
                 compatible_leaves = self.walk_one_char(u, p, verbose=verbose)
                 for leaf in compatible_leaves:
-                    stack.append((leaf, r))
+                    if (leaf, r) not in visited:
+                        visited.add((leaf, r))
+                        stack.append((leaf, r))
         return False
 
     def recognizes_pa_prefix(
@@ -786,10 +1129,11 @@ class RegexpAst:
              ``True`` iff this py:class:`RegexpAst` instance matches ``pa``,
             ``False`` otherwise.
         """
-        stack = deque()
         if u is None:
             u = self.root
-        stack.append((u, 0))
+        # Each (leaf, PA vertex) pair is explored at most once.
+        stack = [(u, 0)]
+        visited = set(stack)
         while stack:
             u, q = stack.pop()
             if u == target_ast_leaf and q == target_pa_node:
@@ -801,7 +1145,9 @@ class RegexpAst:
                 p = pa.label(e)
                 compatible_leaves = self.walk_one_char(u, p)
                 for leaf in compatible_leaves:
-                    stack.append((leaf, r))
+                    if (leaf, r) not in visited:
+                        visited.add((leaf, r))
+                        stack.append((leaf, r))
         return False
 
     def recognizes_word(self, w: list) -> bool:
@@ -853,12 +1199,13 @@ class RegexpAst:
         Retrieves an iterator over the edges of this py:class:`RegexpAst` instance.
 
         Returns:
-            An iterator over this :py:class:`RegexpAst` instance edges.
+            An iterator over this :py:class:`RegexpAst` instance edges,
+            each edge being a ``(u, v)`` pair.
         """
-        return (
-            EdgeDescriptor(u, v, 0)  # TODO: we could just return (u, v)
-            for (u, vs) in self.map_node_children.items()
-            for v in vs
+        return chain.from_iterable(
+            zip(repeat(u), vs)
+            for (u, vs) in enumerate(self.map_node_children)
+            if vs is not None
         )
 
     def out_edges(self, u: int) -> iter:
@@ -877,58 +1224,67 @@ class RegexpAst:
         Returns:
             An iterator over this :py:class:`RegexpAst` instance vertices.
         """
-        return self.map_node_children.keys()
+        return (
+            u
+            for (u, vs) in enumerate(self.map_node_children)
+            if vs is not None
+        )
 
-    def source(self, e: EdgeDescriptor) -> int:
+    def source(self, e: tuple) -> int:
         """
         Retrieves the source of an arc.
 
         Args:
-            e (EdgeDescriptor): The ``EdgeDescriptor`` of the arc.
+            e (tuple): The ``(u, v)`` pair of the arc.
 
         Returns:
             The vertex descriptor of the source of ``e``.
         """
-        return e.m_source
+        return e[0]
 
-    def target(self, e: EdgeDescriptor) -> int:
+    def target(self, e: tuple) -> int:
         """
         Retrieves the target of an arc.
 
         Args:
-            e (EdgeDescriptor): The ``EdgeDescriptor`` of the arc.
+            e (tuple): The ``(u, v)`` pair of the arc.
 
         Returns:
             The vertex descriptor of the target of ``e``.
         """
-        return e.m_target
+        return e[1]
 
     def to_dot(self, **kwargs) -> str:
         """
         Exports this :py:class:`RegexpAst` to Graphviz format.
+        When called without arguments, the result is cached until this
+        :py:class:`RegexpAst` instance is modified.
 
         Returns:
             The corresponding Graphviz string.
         """
+        use_cache = not kwargs
+        if use_cache and self.dot_str is not None:
+            return self.dot_str
         self.directed = True
-        dg = {"rankdir": "TB"}
         dpv = {
             "label": make_func_property_map(
                 lambda u: "%s [%s]" % (u, self.map_node_label[u])
             ),
         }
-        dv = {
-            "shape": "box",
-            "style": "rounded, filled",
-            "ordering": "out"
-        }
-        kwargs = enrich_kwargs(dg, "dg", **kwargs)
+        kwargs = enrich_kwargs(self.DOT_DG, "dg", **kwargs)
         kwargs = enrich_kwargs(dpv, "dpv", **kwargs)
-        kwargs = enrich_kwargs(dv, "dv", **kwargs)
-        return to_dot(self, **kwargs)
+        kwargs = enrich_kwargs(self.DOT_DV, "dv", **kwargs)
+        dot_str = to_dot(self, **kwargs)
+        if use_cache:
+            self.dot_str = dot_str
+        return dot_str
 
 
-def prefix_regexp_to_ast(prefix_regexp: list) -> RegexpAst:
+def prefix_regexp_to_ast(
+    prefix_regexp: list,
+    subtree_table: SubtreeTable = None
+) -> RegexpAst:
     """
     Builds a :py:class:`RegexpAst` instance from a prefix
     regular expression.
@@ -936,13 +1292,14 @@ def prefix_regexp_to_ast(prefix_regexp: list) -> RegexpAst:
     Args:
         prefix_regexp (list): A list modeling a binary prefix regular
            expression e.g. [".", "a", "$date"].
+        subtree_table (SubtreeTable): The table used to compute the
+            subtree keys (see :py:class:`RegexpAst`).
 
     Returns:
         The corresponding :py:class:`RegexpAst` instance.
     """
-    ast = RegexpAst()
-    stack = deque()
-    stack.append((ast.root, 1))
+    ast = RegexpAst(subtree_table)
+    stack = [(ast.root, 1)]
     for regexp_token in prefix_regexp:
         u, child_idx = stack.pop()
         v = ast.add_node(label=regexp_token)
@@ -951,10 +1308,10 @@ def prefix_regexp_to_ast(prefix_regexp: list) -> RegexpAst:
         else:
             ast.append_child(u, v)
 
-        if ast.is_n_ary(v):
-            stack.append((v, 2))
-            stack.append((v, 1))
-        elif ast.is_unary(v):
+        # The arity only depends on the token.
+        if regexp_token in RegexpAst.N_ARY_LABELS:
+            stack += ((v, 2), (v, 1))
+        elif regexp_token in RegexpAst.UNARY_LABELS:
             stack.append((v, 1))
 
     assert len(stack) == 0
@@ -2,15 +2,20 @@
 # -*- coding: utf-8 -*-
 
 from itertools import chain, combinations
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 from .pattern_automaton import PatternAutomaton
-from .regexp_ast import RegexpAst
+from .regexp_ast import ARC_DOWN, ARC_KINDS, ARC_ROOT, ARC_UP, RegexpAst
 
 # TODO remove mutators_to_bounce_on from each constructor
 # TODO transform each class to a function
 
 
 class Mutator:
+    # The kinds of (u, v) arcs (see RegexpAst.arc_kind) on which this
+    # mutator may produce mutants. It allows fast_from_strings to skip
+    # mutators that would return [] anyway.
+    applicable_kinds = ARC_KINDS
+
     def __init__(self, mutators_to_bounce_on):
         self.name = "Default"
 
@@ -27,12 +32,78 @@ class Mutator:
     ) -> List[Tuple[RegexpAst, int]]:
         return []
 
+    def mutate_iter(self, *args) -> Iterator[Tuple[RegexpAst, int]]:
+        """
+        Lazy counterpart of :py:meth:`Mutator.mutate`, allowing the caller
+        to stop consuming the mutants once it has enough of them.
+
+        Args:
+            args: See :py:meth:`Mutator.mutate`.
+
+        Returns:
+            An iterator over the ``(new_ast, new_active_leaf)`` pairs.
+        """
+        yield from self.mutate(*args)
+
+
+def make_mutators_by_kind(mutators: list) -> dict:
+    """
+    Groups mutators according to the kinds of arcs they apply on.
+
+    Args:
+        mutators (list): The list of :py:class:`Mutator` instances.
+
+    Returns:
+        The ``dict`` mapping each arc kind (see :py:data:`ARC_KINDS`) with the
+        list of mutators that may apply on it, in the order of ``mutators``.
+    """
+    return {
+        kind: [
+            mutator for mutator in mutators
+            if kind in getattr(mutator, "applicable_kinds", ARC_KINDS)
+        ]
+        for kind in ARC_KINDS
+    }
+
+
+def move_eps_reachables(
+    eps_reachables: set,
+    children: list,
+    old_parent: int,
+    new_parent: int
+):
+    """
+    Updates in place a set of epsilon reachable arcs when some children
+    are moved from a node to another one. Each ``(child, old_parent)``
+    (resp. ``(old_parent, child)``) arc of ``eps_reachables`` is replaced
+    by ``(child, new_parent)`` (resp. ``(new_parent, child)``).
+
+    Args:
+        eps_reachables (set): The set of epsilon reachable arcs.
+        children (list): The moved children.
+        old_parent (int): The former parent of ``children``.
+        new_parent (int): The new parent of ``children``.
+    """
+    moved = eps_reachables.intersection(
+        chain(
+            ((child, old_parent) for child in children),
+            ((old_parent, child) for child in children)
+        )
+    )
+    eps_reachables -= moved
+    eps_reachables |= {
+        (new_parent, b) if a == old_parent else (a, new_parent)
+        for (a, b) in moved
+    }
+
 
 class DisjunctionMutator(Mutator):
     """
     Downwards mutator, inserting a new 'or' node and a new leaf labeled c.
     Condition: the arc u, v must go downwards.
     """
+    applicable_kinds = frozenset({ARC_DOWN})
+
     def __init__(self, mutators_to_bounce_on):
         self.name = "DisjunctionMutator"
 
@@ -49,11 +120,6 @@ class DisjunctionMutator(Mutator):
     ) -> List[Tuple[RegexpAst, int]]:
         if v is None or ast.is_upwards_arc(u, v):
             return []
-        # print("6____________start")
-        # ipynb_display_graph(ast)
-        # print(u, v, c)
-        # print("6____________end")
-        # print("1 --> %s" % ast.to_prefix_regexp_str())
         new_ast = ast.copy()
         new_or_node = new_ast.add_node(label="|")
         new_leaf = new_ast.add_node(label=c)
@@ -62,10 +128,6 @@ class DisjunctionMutator(Mutator):
         new_ast.set_ith_child(u, new_or_node, i)
         new_ast.append_child(new_or_node, v)
         new_ast.append_child(new_or_node, new_leaf)
-        # print("6bis____________start")
-        # ipynb_display_graph(new_ast)
-        # print(new_leaf)
-        # print("6bis____________end")
         return [(new_ast, new_leaf)]
 
 
@@ -74,6 +136,8 @@ class BotMutator(Mutator):
     'Bot' mutator. Is used to add a leaf to an empty tree.
     Condition: the ast is empty.
     """
+    applicable_kinds = frozenset({ARC_ROOT})
+
     def __init__(self, mutators_to_bounce_on):
         self.name = "BotMutator"
 
@@ -102,6 +166,8 @@ class ActivateMutator(Mutator):
     an existing leaf.
     Condition: v is a c-labeled leaf.
     """
+    applicable_kinds = frozenset({ARC_DOWN})
+
     def __init__(self, mutators_to_bounce_on):
         self.name = "ActivateMutator"
 
@@ -133,6 +199,8 @@ class DownDotMutator(Mutator):
     examples processed, then we also insert a ? node between the dot and v.
     Condition: the arc u, v must go downwards.
     """
+    applicable_kinds = frozenset({ARC_DOWN})
+
     def __init__(self, mutators_to_bounce_on):
         self.name = "DownDotMutator"
 
@@ -149,10 +217,6 @@ class DownDotMutator(Mutator):
     ) -> List[Tuple[RegexpAst, int]]:
         if v is None or ast.is_upwards_arc(u, v):
             return []
-        # print("3____________start")
-        # ipynb_display_graph(ast)
-        # print(u, v, c)
-        # print("3____________end")
         new_ast = ast.copy()
         new_dot_node = new_ast.add_node(label=".")
         new_leaf = new_ast.add_node(label=c)
@@ -165,24 +229,6 @@ class DownDotMutator(Mutator):
         new_ast.set_child(new_question_node, new_leaf)
         return [(new_ast, new_leaf)]
 
-        # new_ast.append_child(new_dot_node, v)
-        # print("3bis____________start")
-        # ipynb_display_graph(new_ast)
-        # print(new_leaf)
-        # print("3bis____________end")
-        # if new_ast.recognizes_pa_prefix(current_pa, target_pa_node=len(prefix_word), target_ast_leaf=new_leaf):
-        #     if all(
-        #             new_ast.recognizes_pa(pa) for pa in previous_words
-        #     ):  # case where all works without the '?'
-
-        # # case where we need to '?' the subtree rooted in v
-        # new_question_node = new_ast.add_node(label="?")
-        # j = new_ast.get_arc_index(new_dot_node, v)  # -> should always be 1
-        # new_ast.set_ith_child(new_dot_node, new_question_node, j)
-        # new_ast.set_child(new_question_node, v)
-
-        # return [(new_ast, new_leaf)]
-
 
 # Right
 class UpDotMutator(Mutator):
@@ -195,6 +241,8 @@ class UpDotMutator(Mutator):
     the leaf
     Condition: the arc u, v must go upwards.
     """
+    applicable_kinds = frozenset({ARC_UP})
+
     def __init__(self, mutators_to_bounce_on):
         self.name = "UpDotMutator"
 
@@ -211,10 +259,6 @@ class UpDotMutator(Mutator):
     ) -> List[Tuple[RegexpAst, int]]:
         if v is None or ast.is_downwards_arc(u, v):
             return []
-        # print("9____________start")
-        # ipynb_display_graph(ast)
-        # print(u, v, c)
-        # print("9____________end")
 
         new_ast = ast.copy()
         new_dot_node = new_ast.add_node(label=".")
@@ -225,10 +269,6 @@ class UpDotMutator(Mutator):
         new_ast.set_ith_child(v, new_dot_node, i)
         new_ast.append_child(new_dot_node, u)
         new_ast.append_child(new_dot_node, new_leaf)
-        # print("9bis____________start")
-        # ipynb_display_graph(new_ast)
-        # print(new_leaf)
-        # print("9bis____________end")
         if (
             (
                 isinstance(current_pa, str)
@@ -276,7 +316,133 @@ NON_BOUCING_MUTATORS = [
 MUTATORS_TO_BOUNCE_ON = NON_BOUCING_MUTATORS
 
 
-class BouncePlusMutator(Mutator):
+class BouncingMutator(Mutator):
+    """
+    Base class of the 'bouncer' mutators. A bouncer first inserts an
+    operator node in the ast, then applies its mutators to bounce on
+    to the arcs that have become epsilon reachable.
+    """
+    def __init__(self, mutators_to_bounce_on):
+        self.mutators_to_bounce_on = mutators_to_bounce_on
+        # Instances of mutators_to_bounce_on grouped by applicable kind,
+        # built on the first call to bounce (a bouncer may bounce on itself).
+        self.mutators_by_kind = None
+        self.name = "BouncingMutator"
+
+    def iter_asts_to_bounce_on(
+        self,
+        ast: RegexpAst,
+        u,
+        v,
+        epsilon_reachables: List[tuple],
+    ) -> Iterator[tuple]:
+        """
+        Applies the first mutation of this bouncer (to be overloaded).
+
+        Args:
+            ast, u, v, epsilon_reachables: See :py:meth:`Mutator.mutate`.
+
+        Returns:
+            An iterator over the
+            ``(new_ast, all_epsilon_reachables, newly_eps_reachables)``
+            triples to bounce on (see :py:meth:`BouncingMutator.bounce`).
+        """
+        return iter(())
+
+    def bounce(
+        self,
+        asts_to_bounce_on: Iterator[tuple],
+        c,
+        prefix_word: list,
+        previous_words: List[list],
+        current_pa,
+    ) -> Iterator[Tuple[RegexpAst, int]]:
+        """
+        Applies the mutators to bounce on to the newly epsilon reachable
+        arcs of some mutated asts.
+
+        Args:
+            asts_to_bounce_on (iter): The
+                ``(new_ast, all_epsilon_reachables, newly_eps_reachables)``
+                triples, where ``new_ast`` is a mutated ast,
+                ``all_epsilon_reachables`` its epsilon reachable arcs
+                and ``newly_eps_reachables`` those that were not epsilon
+                reachable before the mutation.
+            c, prefix_word, previous_words, current_pa:
+                See :py:meth:`Mutator.mutate`.
+
+        Returns:
+            An iterator over the ``(new_ast, new_active_leaf)`` pairs.
+        """
+        if self.mutators_by_kind is None:
+            self.mutators_by_kind = make_mutators_by_kind([
+                mutator(self.mutators_to_bounce_on)
+                for mutator in self.mutators_to_bounce_on
+            ])
+        for new_ast, all_epsilon_reachables, newly_eps_reachables in asts_to_bounce_on:
+            # The mutants of new_ast are all built before being yielded,
+            # as some of them (see ActivateMutator) are new_ast itself,
+            # which the caller may modify (e.g., simplify).
+            result = []
+            for uu, vv in newly_eps_reachables:
+                for mutator in self.mutators_by_kind[new_ast.arc_kind(uu, vv)]:
+                    result.extend(mutator.mutate(
+                        new_ast,
+                        c,
+                        uu,
+                        vv,
+                        prefix_word,
+                        previous_words,
+                        all_epsilon_reachables,
+                        current_pa,
+                    ))
+            yield from result
+
+    def mutate(
+        self,
+        ast: RegexpAst,
+        c,
+        u,
+        v,
+        prefix_word: list,
+        previous_words: List[list],
+        epsilon_reachables: List[tuple],
+        current_pa,
+    ) -> List[Tuple[RegexpAst, int]]:
+        return list(self.mutate_iter(
+            ast, c, u, v, prefix_word, previous_words,
+            epsilon_reachables, current_pa
+        ))
+
+    def mutate_iter(
+        self,
+        ast: RegexpAst,
+        c,
+        u,
+        v,
+        prefix_word: list,
+        previous_words: List[list],
+        epsilon_reachables: List[tuple],
+        current_pa,
+    ) -> Iterator[Tuple[RegexpAst, int]]:
+        """
+        Lazy counterpart of :py:meth:`BouncingMutator.mutate`. The asts to
+        bounce on are built one by one, as the mutants are consumed.
+
+        Args:
+            ast, c, u, v, prefix_word, previous_words, epsilon_reachables,
+            current_pa: See :py:meth:`Mutator.mutate`.
+
+        Returns:
+            An iterator over the ``(new_ast, new_active_leaf)`` pairs.
+        """
+        return self.bounce(
+            self.iter_asts_to_bounce_on(ast, u, v, epsilon_reachables),
+            c, prefix_word, previous_words, current_pa
+        )
+
+
+class BouncePlusMutator(BouncingMutator):
     """
     'Bouncer' mutator.
     Starts by applying a first mutation on e (insertion of +).
@@ -286,34 +452,35 @@ class BouncePlusMutator(Mutator):
     Condition: u, v is an upwards arc,
     and v, u is not epsilon-reachable from the current leaf.
     """
+    applicable_kinds = frozenset({ARC_UP})
+
     def __init__(self, mutators_to_bounce_on):
-        self.mutators_to_bounce_on = mutators_to_bounce_on
+        super().__init__(mutators_to_bounce_on)
         self.name = "BouncePlusMutator"
 
-    def mutate(
+    def iter_asts_to_bounce_on(
         self,
         ast: RegexpAst,
-        c,
         u,
         v,
-        prefix_word: list,
-        previous_words: List[list],
         epsilon_reachables: List[tuple],
-        current_pa,
-    ) -> List[Tuple[RegexpAst, int]]:
-        result = []
+    ) -> Iterator[tuple]:
+        """
+        Inserts a '+' node above ``u``, possibly grouping ``u`` with some
+        of its siblings.
+
+        Args:
+            ast, u, v, epsilon_reachables: See :py:meth:`Mutator.mutate`.
+
+        Returns:
+            An iterator over the
+            ``(new_ast, all_epsilon_reachables, newly_eps_reachables)``
+            triples to bounce on (see :py:meth:`BouncingMutator.bounce`).
+        """
         if v is None \
            or ast.is_downwards_arc(u, v) \
            or (v, u) in epsilon_reachables:
-            return result
-
-        asts_to_bounce_on = []
-        # print("1______start")
-        # print(ast.to_prefix_regexp_str())
-        # ipynb_display_graph(ast)
-        # print(u, v)
-        # print(epsilon_reachables)
-        # print("1______end")
+            return
         # In any case, we simply introduce a '+' between u & v
         new_ast = ast.copy()
         new_plus_node = new_ast.add_node(label="+")
@@ -332,30 +499,20 @@ class BouncePlusMutator(Mutator):
         )
         newly_eps_reachables = new_eps_reachables - local_eps_reachables
         all_epsilon_reachables = new_eps_reachables | local_eps_reachables
-        # print("1bis______start")
-        # print(new_ast.to_prefix_regexp_str())
-        # ipynb_display_graph(new_ast)
-        # print(new_plus_node, v)
-        # print(local_eps_reachables)
-        # print("1bis______end")
-        asts_to_bounce_on.append((
-            new_ast, all_epsilon_reachables, newly_eps_reachables
-        ))
+        yield (new_ast, all_epsilon_reachables, newly_eps_reachables)
 
         if ast.is_n_ary(v) and ast.label(v) == ".":
             # in this case, there are several possibilities to insert a + node
             # with u the ith child, we put the range j-k of v's children below
             # the +, with j <= i <= k
             i = ast.get_arc_index(v, u)
-            for j in range(i):
-                # remove the case where all children would have to move
-                # as it will be handled when processing the arc (v, p_v)
-                if i == ast.num_children(v) and j == 0:
-                    continue
+            v_children = ast.children(v)
+            # remove the case where all children would have to move
+            # as it will be handled when processing the arc (v, p_v)
+            for j in range(1 if i == len(v_children) else 0, i):
                 new_ast = ast.copy()
                 new_plus_node = new_ast.add_node(label="+")
                 new_dot_node = new_ast.add_node(label=".")
-                v_children = new_ast.children(v)
                 new_ast.set_children(
                     v,
                     v_children[:j] + [new_plus_node] + v_children[i+1:]
@@ -378,13 +535,9 @@ class BouncePlusMutator(Mutator):
                 }
                 # we now 'repair' the eps reachables arcs
                 # which have been modified
-                for v_child in v_children[j: i+1]:
-                    if (v_child, v) in local_eps_reachables:
-                        local_eps_reachables.remove((v_child, v))
-                        local_eps_reachables.add((v_child, new_dot_node))
-                    if (v, v_child) in local_eps_reachables:
-                        local_eps_reachables.remove((v, v_child))
-                        local_eps_reachables.add((new_dot_node, v_child))
+                move_eps_reachables(
+                    local_eps_reachables, v_children[j: i+1], v, new_dot_node
+                )
                 # finally, we add the reachable arcs that can be accessed
                 # using the plus node we just added
                 new_eps_reachables = new_ast.epsilon_reachables(
@@ -393,9 +546,7 @@ class BouncePlusMutator(Mutator):
                 newly_eps_reachables = new_eps_reachables - local_eps_reachables
                 all_epsilon_reachables = new_eps_reachables | local_eps_reachables
                 # and add this couple for further bouncing
-                asts_to_bounce_on += [
-                    (new_ast, all_epsilon_reachables, newly_eps_reachables)
-                ]
+                yield (new_ast, all_epsilon_reachables, newly_eps_reachables)
 
         if ast.is_n_ary(v) and ast.label(v) == "|":
             # in this case, there are several possibilities to insert a + node
@@ -407,30 +558,27 @@ class BouncePlusMutator(Mutator):
             # the case all children leaving is processed when handling (v, p_v)
 
             i = ast.get_arc_index(v, u)
-            others = ast.children(v)[:i] + ast.children(v)[i+1:]
-            # print("13_____start")
-            # ipynb_display_graph(ast)
+            v_children = ast.children(v)
+            others = v_children[:i] + v_children[i+1:]
             for child_combi in chain.from_iterable(
                 combinations(others, num_others)
                 for num_others in range(1, len(others))
             ):
-                new_ast = ast.copy()
-                new_plus_node = new_ast.add_node(label="+")
-                new_or_node = new_ast.add_node(label="|")
                 children_leaving = list(child_combi) + [u]
+                leaving = set(children_leaving)
                 children_staying = [
-                    child for child in new_ast.children(v)
-                    if child not in children_leaving
+                    child for child in v_children
+                    if child not in leaving
                 ]
-                # print(children_leaving)
-                # print(children_staying)
                 # should never happen, but better safe than sorry
                 if len(children_staying) == 0:
                     continue
+                new_ast = ast.copy()
+                new_plus_node = new_ast.add_node(label="+")
+                new_or_node = new_ast.add_node(label="|")
                 new_ast.set_children(v, children_staying + [new_plus_node])
                 new_ast.set_child(new_plus_node, new_or_node)
                 new_ast.set_children(new_or_node, children_leaving)
-                # ipynb_display_graph(new_ast)
                 # create a 'local' epsilon_reachables specific to this new ast
                 # and takes in account the modification done on it
                 local_eps_reachables = epsilon_reachables.copy()
@@ -444,13 +592,9 @@ class BouncePlusMutator(Mutator):
                 }
                 # we now 'repair' the eps reachables arcs
                 # which have been modified
-                for v_child in children_leaving:
-                    if (v_child, v) in local_eps_reachables:
-                        local_eps_reachables.remove((v_child, v))
-                        local_eps_reachables.add((v_child, new_or_node))
-                    if (v, v_child) in local_eps_reachables:
-                        local_eps_reachables.remove((v, v_child))
-                        local_eps_reachables.add((new_or_node, v_child))
+                move_eps_reachables(
+                    local_eps_reachables, children_leaving, v, new_or_node
+                )
                 # finally, we add the reachable arcs that can be accessed
                 # using the plus node we just added
                 new_eps_reachables = new_ast.epsilon_reachables(
@@ -459,41 +603,10 @@ class BouncePlusMutator(Mutator):
                 newly_eps_reachables = new_eps_reachables - local_eps_reachables
                 all_epsilon_reachables = new_eps_reachables | local_eps_reachables
                 # and add this couple for further bouncing
-                # print(epsilon_reachables)
-                # print(local_eps_reachables)
-                # print(new_eps_reachables)
-                # print(all_epsilon_reachables)
-                # print(new_eps_reachables)
-                asts_to_bounce_on += [
-                    (new_ast, all_epsilon_reachables, newly_eps_reachables)
-                ]
-
-        for new_ast, all_epsilon_reachables, newly_eps_reachables in asts_to_bounce_on:
-            for uu, vv in newly_eps_reachables:
-                for mutator in self.mutators_to_bounce_on:
-                    # print("11_____start")
-                    if (uu, vv) not in all_epsilon_reachables:
-                        # print("ouch2")
-                        pass
-                    # ipynb_display_graph(new_ast)
-                    # print(uu, vv)
-                    # print(all_epsilon_reachables)
-                    # print(newly_eps_reachables)
-                    result += mutator(self.mutators_to_bounce_on).mutate(
-                        new_ast,
-                        c,
-                        uu,
-                        vv,
-                        prefix_word,
-                        previous_words,
-                        all_epsilon_reachables,
-                        current_pa,
-                    )
-                    # print("11_____end")
-        return result
+                yield (new_ast, all_epsilon_reachables, newly_eps_reachables)
 
 
-class BounceQuestionMutator(Mutator):
+class BounceQuestionMutator(BouncingMutator):
     """
     'Bouncer' mutator.
     Starts by applying a first mutation on e (insertion of ?).
@@ -503,39 +616,38 @@ class BounceQuestionMutator(Mutator):
     Condition: u, v is an downwards arc,
     and v, u is not epsilon-reachable from the current leaf.
     """
+    applicable_kinds = frozenset({ARC_DOWN})
+
     def __init__(self, mutators_to_bounce_on):
         """
         Constructor.
         """
-        self.mutators_to_bounce_on = mutators_to_bounce_on
+        super().__init__(mutators_to_bounce_on)
         self.name = "BounceQuestionMutator"
 
-    def mutate(
+    def iter_asts_to_bounce_on(
         self,
         ast: RegexpAst,
-        c,
         u,
         v,
-        prefix_word: list,
-        previous_words: List[list],
         epsilon_reachables: List[tuple],
-        current_pa,
-    ) -> List[Tuple[RegexpAst, int]]:
+    ) -> Iterator[tuple]:
         """
-        Mutation related to the '?' operator.
+        Mutation related to the '?' operator: inserts a '?' node above
+        ``v``, possibly grouping ``v`` with some of its siblings.
+
+        Args:
+            ast, u, v, epsilon_reachables: See :py:meth:`Mutator.mutate`.
+
+        Returns:
+            An iterator over the
+            ``(new_ast, all_epsilon_reachables, newly_eps_reachables)``
+            triples to bounce on (see :py:meth:`BouncingMutator.bounce`).
         """
-        result = []
         if v is None \
            or ast.is_upwards_arc(u, v) \
            or (v, u) in epsilon_reachables:
-            return result
-        # print("2______start")
-        # print(ast.to_prefix_regexp_str())
-        # ipynb_display_graph(ast)
-        # print(u, v)
-        # print(epsilon_reachables)
-        # print("2______end")
-        asts_to_bounce_on = []
+            return
         # In any case, we simply introduce a '?' between u & v
         new_ast = ast.copy()
         new_question_node = new_ast.add_node(label="?")
@@ -554,27 +666,17 @@ class BounceQuestionMutator(Mutator):
         )
         newly_eps_reachables = new_eps_reachables - local_eps_reachables
         all_epsilon_reachables = new_eps_reachables | local_eps_reachables
-        # print("2bis______start")
-        # print(new_ast.to_prefix_regexp_str())
-        # ipynb_display_graph(new_ast)
-        # print(new_question_node, u)
-        # print(local_eps_reachables)
-        # print("2bis______end")
-        asts_to_bounce_on.append((
-            new_ast, all_epsilon_reachables, newly_eps_reachables
-        ))
+        yield (new_ast, all_epsilon_reachables, newly_eps_reachables)
 
         if ast.is_n_ary(u) and ast.label(u) == ".":
             i = ast.get_arc_index(u, v)
-            for j in range(i+1, ast.num_children(u)):
-                # remove the case where all children would have to move
-                # as it will be handled when processing the arc (v, p_v)
-                if i == 0 and j == ast.num_children(u) - 1:
-                    continue
+            u_children = ast.children(u)
+            # remove the case where all children would have to move
+            # as it will be handled when processing the arc (v, p_v)
+            for j in range(i+1, len(u_children) - 1 if i == 0 else len(u_children)):
                 new_ast = ast.copy()
                 new_question_node = new_ast.add_node(label="?")
                 new_dot_node = new_ast.add_node(label=".")
-                u_children = new_ast.children(u)
                 new_ast.set_children(
                     u,
                     u_children[:i] + [new_question_node] + u_children[j+1:]
@@ -597,13 +699,9 @@ class BounceQuestionMutator(Mutator):
                 }
                 # we now 'repair' the eps reachables arcs
                 # which have been modified
-                for u_child in u_children[i: j+1]:
-                    if (u, u_child) in local_eps_reachables:
-                        local_eps_reachables.remove((u, u_child))
-                        local_eps_reachables.add((new_dot_node, u_child))
-                    if (u_child, u) in local_eps_reachables:
-                        local_eps_reachables.remove((u_child, u))
-                        local_eps_reachables.add((u_child, new_dot_node))
+                move_eps_reachables(
+                    local_eps_reachables, u_children[i: j+1], u, new_dot_node
+                )
                 # finally, we add the reachable arcs that can be accessed
                 # using the plus node we just added
                 new_eps_reachables = new_ast.epsilon_reachables(
@@ -612,36 +710,31 @@ class BounceQuestionMutator(Mutator):
                 all_epsilon_reachables = new_eps_reachables | local_eps_reachables
                 newly_eps_reachables = new_eps_reachables - local_eps_reachables
                 # and add this couple for further bouncing
-                asts_to_bounce_on += [
-                    (new_ast, all_epsilon_reachables, newly_eps_reachables)
-                ]
+                yield (new_ast, all_epsilon_reachables, newly_eps_reachables)
 
         if ast.is_n_ary(u) and ast.label(u) == "|":
             i = ast.get_arc_index(u, v)
-            others = ast.children(u)[:i] + ast.children(u)[i+1:]
-            # print("12_____start")
-            # ipynb_display_graph(ast)
+            u_children = ast.children(u)
+            others = u_children[:i] + u_children[i+1:]
             for child_combi in chain.from_iterable(
                     combinations(others, num_others)
                     for num_others in range(1, len(others))
             ):
-                new_ast = ast.copy()
-                new_question_node = new_ast.add_node(label="?")
-                new_or_node = new_ast.add_node(label="|")
                 children_leaving = list(child_combi) + [v]
+                leaving = set(children_leaving)
                 children_staying = [
-                    child for child in new_ast.children(u)
-                    if child not in children_leaving
+                    child for child in u_children
+                    if child not in leaving
                 ]
-                # print(children_leaving)
-                # print(children_staying)
                 # should never happen, but better safe than sorry
                 if len(children_staying) == 0:
                     continue
+                new_ast = ast.copy()
+                new_question_node = new_ast.add_node(label="?")
+                new_or_node = new_ast.add_node(label="|")
                 new_ast.set_children(u, children_staying + [new_question_node])
                 new_ast.set_child(new_question_node, new_or_node)
                 new_ast.set_children(new_or_node, children_leaving)
-                # ipynb_display_graph(new_ast)
                 # create a 'local' epsilon_reachables specific to this new ast
                 # and takes in account the modification done on it
                 local_eps_reachables = epsilon_reachables.copy()
@@ -655,13 +748,9 @@ class BounceQuestionMutator(Mutator):
                 }
                 # we now 'repair' the eps reachables arcs
                 # which have been modified
-                for u_child in children_leaving:
-                    if (u, u_child) in local_eps_reachables:
-                        local_eps_reachables.remove((u, u_child))
-                        local_eps_reachables.add((new_or_node, u_child))
-                    if (u_child, u) in local_eps_reachables:
-                        local_eps_reachables.remove((u_child, u))
-                        local_eps_reachables.add((u_child, new_or_node))
+                move_eps_reachables(
+                    local_eps_reachables, children_leaving, u, new_or_node
+                )
                 # finally, we add the reachable arcs that can be accessed
                 # using the plus node we just added
                 new_eps_reachables = new_ast.epsilon_reachables(
@@ -670,38 +759,7 @@ class BounceQuestionMutator(Mutator):
                 newly_eps_reachables = new_eps_reachables - local_eps_reachables
                 all_epsilon_reachables = new_eps_reachables | local_eps_reachables
                 # and add this couple for further bouncing
-                # print(epsilon_reachables)
-                # print(local_eps_reachables)
-                # print(new_eps_reachables)
-                # print(all_epsilon_reachables)
-                # print(new_eps_reachables)
-                asts_to_bounce_on += [
-                    (new_ast, all_epsilon_reachables, newly_eps_reachables)
-                ]
-            # print("12_____end")
-        for new_ast, all_epsilon_reachables, newly_eps_reachables in asts_to_bounce_on:
-            for uu, vv in newly_eps_reachables:
-                if (uu, vv) not in all_epsilon_reachables:
-                    # print("ouch1")
-                    pass
-                # print("10_____start")
-                # ipynb_display_graph(new_ast)
-                # print(uu, vv)
-                # print(all_epsilon_reachables)
-                # print(newly_eps_reachables)
-                for mutator in self.mutators_to_bounce_on:
-                    result += mutator(self.mutators_to_bounce_on).mutate(
-                        new_ast,
-                        c,
-                        uu,
-                        vv,
-                        prefix_word,
-                        previous_words,
-                        all_epsilon_reachables,
-                        current_pa,
-                    )
-                # print("10_____end")
-        return result
+                yield (new_ast, all_epsilon_reachables, newly_eps_reachables)
 
 
 BOUNCING_MUTATORS = [
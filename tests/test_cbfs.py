@@ -0,0 +1,26 @@
+#!/usr/bin/env pytest-3
+# -*- coding: utf-8 -*-
+
+from fast.cbfs import CBFS
+
+
+def test_cbfs_cycles_over_nonempty_queues():
+    q = CBFS(5)
+    for (item, push_idx) in [(3, 1), (1, 1), (2, 3), (0, 4), (5, 3)]:
+        q.push(item, push_idx)
+    popped = []
+    while not q.is_empty():
+        popped.append(q.pop())
+    assert popped == [1, 2, 0, 3, 5]
+
+
+def test_cbfs_push_many():
+    q = CBFS(2)
+    q.push(4, 0)
+    q.push_many([7, 1, 3, 0, 6, 2, 5], 0)
+    q.push_many([8], 1)
+    assert q.queues[0][0] == 0
+    popped = []
+    while not q.is_empty():
+        popped.append(q.pop())
+    assert popped == [0, 8, 1, 2, 3, 4, 5, 6, 7]
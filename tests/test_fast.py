@@ -1,9 +1,79 @@
 #!/usr/bin/env pytest-3
 
-from fast import fast
+from multiprocessing import get_context
+from fast import fast, fast_from_strings
+from fast.find_ast_visitor import FindAstFromStringsDefaultVisitor
+
 
 def test_fast():
     samples = ["abc", "abcabc", "abcabcabc"]
     results = fast(samples)
     for (score, ast) in results:
         print(score, ast.to_infix_regexp_str())
+
+
+def test_fast_next_example():
+    # The symbols must be read from the current example, not from the
+    # one processed before switching to it.
+    samples = ["a", "b", "ab"]
+    results = fast(samples)
+    assert len(results) == 1
+    (_, ast) = results[0]
+    assert all(ast.recognizes(sample) for sample in samples)
+
+
+def test_fast_from_strings_max_pushes_per_pop():
+    # Counts the children pushed after each pop.
+    class PushCounterVisitor(FindAstFromStringsDefaultVisitor):
+        def __init__(self):
+            super().__init__()
+            self.num_pushes = list()
+
+        def visit_pop_item(self, pq_item: tuple):
+            self.num_pushes.append(0)
+
+        def visit_push_item(self, mutator, new_depth: int, new_pq_item: tuple):
+            self.num_pushes[-1] += 1
+
+    samples = ["abc", "abcabc", "abcabcabc"]
+    (unbounded, bounded) = (PushCounterVisitor(), PushCounterVisitor())
+    fast_from_strings(samples, visitor=unbounded)
+    fast_from_strings(samples, visitor=bounded, max_pushes_per_pop=1)
+    assert max(unbounded.num_pushes) > 1
+    assert max(bounded.num_pushes) == 1
+
+
+def test_fast_from_strings_objective_cache_size():
+    # The evicted objective values and recognition results are recomputed,
+    # hence the search is not altered, and a recognition result computed
+    # on the first examples is never taken for the other ones.
+    samples = ["a", "b", "ab"]
+    expected = [
+        (score, ast.to_prefix_regexp_str())
+        for (score, ast) in fast_from_strings(samples)
+    ]
+    for objective_cache_size in (1, 4):
+        results = fast_from_strings(
+            samples, objective_cache_size=objective_cache_size
+        )
+        assert [
+            (score, ast.to_prefix_regexp_str())
+            for (score, ast) in results
+        ] == expected
+        for (_, ast) in results:
+            assert all(ast.recognizes(sample) for sample in samples)
+
+
+def test_fast_from_strings_num_workers():
+    # The worker processes are spawned, hence the examples, the mutators
+    # and the (default) objective function must be pickled.
+    samples = ["abc", "abcabc", "abcabcabc"]
+    results = fast_from_strings(
+        samples,
+        num_workers=2,
+        objective_cache_size=16,
+        mp_context=get_context("spawn")
+    )
+    assert len(results) == 1
+    (_, ast) = results[0]
+    assert all(ast.recognizes(sample) for sample in samples)
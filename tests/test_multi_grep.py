@@ -0,0 +1,41 @@
+#!/usr/bin/env pytest
+# -*- coding: utf-8 -*-
+
+from fast.multi_grep import MultiDfa, MultiGrepFonctorAll, multi_grep
+from fast.regexp import make_map_name_dfa
+
+MAP_NAME_DFA = make_map_name_dfa(["float", "int", "ipv4", "spaces", "uint"])
+WORDS = [
+    "11.22.33.44 55.66 789",
+    "10   abc  1.2.3.4  de 56.78",
+    "-1.5e",
+    "",
+]
+
+
+def test_multi_dfa():
+    # multi_grep must report the same matches, in the same order, as
+    # the DFAs run one by one on each infix.
+    multi_dfa = MultiDfa(MAP_NAME_DFA)
+    for w in WORDS:
+        expected = [
+            (name, j, k)
+            for k in range(1, len(w) + 1)
+            for (name, g) in MAP_NAME_DFA.items()
+            for j in range(k)
+            if g.accepts(w[j:k])
+        ]
+        for map_name_dfa in (MAP_NAME_DFA, multi_dfa):
+            obtained = list()
+            multi_grep(
+                w, map_name_dfa,
+                lambda name, j, k, w: obtained.append((name, j, k))
+            )
+            assert obtained == expected
+
+
+def test_multi_grep_fonctor_all():
+    w = "1.2.3.4"
+    mg = MultiGrepFonctorAll()
+    multi_grep(w, MAP_NAME_DFA, mg)
+    assert mg.indices()["ipv4"] == [(0, 7)]
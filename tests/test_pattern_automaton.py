@@ -1,8 +1,9 @@
 #!/usr/bin/env pytest-3
 # -*- coding: utf-8 -*-
 
+import pytest
 from fast.regexp import make_map_name_dfa
-from fast.pattern_automaton import PatternAutomaton
+from fast.pattern_automaton import PatternAutomaton, pattern_automaton_to_path
 
 MAP_NAME_DFA = make_map_name_dfa(["float", "int", "ipv4", "spaces", "uint"])
 
@@ -33,6 +34,18 @@ def test_pattern_automaton_equals():
     assert g1 == g3
 
 
+def test_pattern_automaton_fingerprint():
+    g1 = PatternAutomaton("11.22.33.44 55.66 789", MAP_NAME_DFA)
+    g2 = PatternAutomaton("55.66.77.88 9876 55.44", MAP_NAME_DFA)
+    g3 = PatternAutomaton("1.2.3.4 77.88 90", MAP_NAME_DFA)
+    assert g1.fingerprint() == g3.fingerprint()
+    assert g1.fingerprint() != g2.fingerprint()
+    assert len(g1.fingerprint()) == g1.num_edges()
+    # Equality is language equality, which is not a valid hash key.
+    with pytest.raises(TypeError):
+        hash(g1)
+
+
 def test_pattern_automaton_get_slice():
     w = "10   abc  1.2.3.4  de 56.78"
     g = PatternAutomaton(w, MAP_NAME_DFA)
@@ -107,3 +120,26 @@ def test_pattern_automaton_get_slice():
         "78",       # uint
     ]
     assert infixes == expected
+
+
+def test_pattern_automaton_to_path():
+    w = "11.22.33.44 55.66 789"
+    g = PatternAutomaton(w, MAP_NAME_DFA)
+    map_name_density = {
+        "float": 0.3,
+        "int": 0.5,
+        "ipv4": 0.1,
+        "spaces": 0.2,
+        "uint": 0.4,
+    }
+    path = pattern_automaton_to_path(g, map_name_density=map_name_density)
+    assert [g.label(e) for e in path] == [
+        "ipv4", "spaces", "float", "spaces", "float"
+    ]
+    # Same result using pybgl.dijkstra_shortest_path
+    path = pattern_automaton_to_path(
+        g, map_name_density=map_name_density, zero=0
+    )
+    assert [g.label(e) for e in path] == [
+        "ipv4", "spaces", "float", "spaces", "float"
+    ]
@@ -1,13 +1,71 @@
 #!/usr/bin/env pytest-3
 # -*- coding: utf-8 -*-
 
-from pybgl.regexp import compile_dfa
-from fast.random import random_word_from_automaton
-from fast.regexp import RE_IPV4
+import random
+from pybgl.automaton import Automaton
+from fast.random import random_ast, random_word_from_automaton
+from fast.regexp import RE_IPV4, make_dfa
 
 
 def test_random_word_from_automaton():
-    g = compile_dfa(RE_IPV4)
+    g = make_dfa(RE_IPV4)
     for _ in range(5):
         w = random_word_from_automaton(g, p=0.5, max_sampling=None)
         assert g.accepts(w)
+
+
+def test_random_word_from_automaton_modified():
+    g = Automaton(2)
+    g.add_edge(0, 1, "a")
+    g.set_final(1)
+    assert random_word_from_automaton(g) == "a"
+    # Sampling again must reflect the changes made on g.
+    g.add_vertex()
+    g.add_edge(0, 2, "b")
+    g.set_final(1, False)
+    g.set_final(2)
+    for _ in range(5):
+        assert random_word_from_automaton(g, max_sampling=None) == "b"
+
+
+def test_random_word_from_automaton_shared_transitions():
+    g = make_dfa(RE_IPV4)
+    map_q_transitions = dict()
+    for _ in range(5):
+        w = random_word_from_automaton(
+            g, max_sampling=None, map_q_transitions=map_q_transitions
+        )
+        assert g.accepts(w)
+    assert map_q_transitions[g.initial()] == tuple(
+        (g.target(e), g.label(e)) for e in g.out_edges(g.initial())
+    )
+
+
+def ast_to_expr(ast, u) -> str:
+    children = ast.children(u)
+    a = ast.symbol(u)
+    if not children:
+        return a
+    elif len(children) == 1:
+        return "(%s)%s" % (ast_to_expr(ast, children[0]), a)
+    else:
+        return "(%s)" % a.join(ast_to_expr(ast, v) for v in children)
+
+
+def test_random_ast():
+    # The expected ASTs are the ones drawn by the former recursive
+    # implementation, given the same seed.
+    map_len_expected = {
+        1: "e",
+        3: "((r)*)?",
+        8: "(((w)*.(((g)+)?)*))+",
+        15: "(((((((k)+.((g|(l)+)|(h)+)))?)?)*)*)*",
+    }
+    for (re_len, expected) in map_len_expected.items():
+        random.seed(re_len)
+        ast = random_ast(re_len)
+        assert ast.num_vertices() == re_len
+        assert ast_to_expr(ast, ast.root) == expected
+    ast = random_ast(5000)
+    assert ast.num_vertices() == 5000
+    assert ast.num_edges() == 4999
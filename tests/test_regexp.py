@@ -3,7 +3,9 @@
 
 from pybgl.regexp import compile_dfa
 from fast.regexp import (
+    make_dfa,
     make_dfa_any,
+    minimize_dfa,
     RE_0_128,
     RE_0_255,
     RE_0_32,
@@ -31,6 +33,25 @@ def test_make_dfa_any():
     assert g.accepts("#!~@")
 
 
+def test_minimize_dfa():
+    g = compile_dfa(RE_FLOAT)
+    h = minimize_dfa(g)
+    assert h.initial() == 0
+    assert h.num_vertices() < g.num_vertices()
+    for w in ["0", "-12", "+3.14", "1.", ".5", "1.2.3", "", "+"]:
+        assert g.accepts(w) == h.accepts(w)
+
+
+def test_make_dfa_copy():
+    g = make_dfa(RE_UINT)
+    assert g.accepts("12")
+    # Modifying the returned DFA does not alter the next calls.
+    for q in g.vertices():
+        g.set_final(q, False)
+    assert not g.accepts("12")
+    assert make_dfa(RE_UINT).accepts("12")
+
+
 def test_re_0_n():
     map_max_re = {
         32: RE_0_32,
@@ -38,7 +59,7 @@ def test_re_0_n():
         255: RE_0_255,
     }
     for (n, regexp) in map_max_re.items():
-        g = compile_dfa(regexp)
+        g = make_dfa(regexp)
         for i in range(n + 1):
             assert g.accepts(str(i))
         assert not g.accepts("-1")
@@ -46,7 +67,7 @@ def test_re_0_n():
 
 
 def test_re_alnum():
-    g = compile_dfa(RE_ALNUM)
+    g = make_dfa(RE_ALNUM)
     assert g.accepts("0")
     assert g.accepts("12")
     assert not g.accepts("-123")
@@ -55,13 +76,13 @@ def test_re_alnum():
 
 
 def test_re_delimiters():
-    g = compile_dfa(RE_DELIMITER)
+    g = make_dfa(RE_DELIMITER)
     assert g.accepts("---")
     assert g.accepts("======")
 
 
 def test_re_hexa():
-    g = compile_dfa(RE_HEXA)
+    g = make_dfa(RE_HEXA)
     assert g.accepts("0")
     assert g.accepts("12")
     assert not g.accepts("-123")
@@ -71,7 +92,7 @@ def test_re_hexa():
 
 
 def test_re_float():
-    g = compile_dfa(RE_FLOAT)
+    g = make_dfa(RE_FLOAT)
     assert g.accepts("1")
     assert g.accepts("1.2")
     assert g.accepts("12.34")
@@ -81,7 +102,7 @@ def test_re_float():
 
 
 def test_re_int():
-    g = compile_dfa(RE_INT)
+    g = make_dfa(RE_INT)
     assert g.accepts("0")
     assert g.accepts("12")
     assert g.accepts("-123")
@@ -90,7 +111,7 @@ def test_re_int():
 
 
 def test_re_ipv4():
-    g = compile_dfa(RE_IPV4)
+    g = make_dfa(RE_IPV4)
     assert g.accepts("192.168.0.255")
     assert g.accepts("190.068.0.255")
     assert g.accepts("0.0.0.0")
@@ -102,7 +123,7 @@ def test_re_ipv4():
 
 
 def test_re_ipv6():
-    g = compile_dfa(RE_IPV6)
+    g = make_dfa(RE_IPV6)
     assert g.accepts("::1")
     assert g.accepts("2a02:a802:23::1")
     assert g.accepts("2a01:e35:2e49:10c0:eeb3:6f16:6bd4:d833")
@@ -116,7 +137,7 @@ def test_re_ipv6():
 
 
 def test_re_net_ipv4():
-    g = compile_dfa(RE_NET_IPV4)
+    g = make_dfa(RE_NET_IPV4)
     assert g.accepts("0.0.0.0") is False
     assert g.accepts("0.0.0.0/0") is True
     assert g.accepts("192.168.1.0/24") is True
@@ -126,7 +147,7 @@ def test_re_net_ipv4():
 
 
 def test_re_net_ipv6():
-    g = compile_dfa(RE_NET_IPV6)
+    g = make_dfa(RE_NET_IPV6)
     assert g.accepts("2a02:a802:23::1") is False
     assert g.accepts("2a02:a802:23::1/44") is True
     assert g.accepts("2a02:a802:23::1/128") is True
@@ -137,28 +158,28 @@ def test_re_net_ipv6():
 
 
 def test_re_path():
-    g = compile_dfa(RE_PATH)
+    g = make_dfa(RE_PATH)
     assert not g.accepts("aaa/bbb")
     assert g.accepts("/aaa/bbb")
     assert g.accepts("/my_folder0/my-subdir1")
 
 
 def test_re_spaces():
-    g = compile_dfa(RE_SPACES)
+    g = make_dfa(RE_SPACES)
     assert g.accepts("  ")
     assert g.accepts("  \t  ")
     assert not g.accepts(" x \t y ")
 
 
 def test_re_word():
-    g = compile_dfa(RE_WORD)
+    g = make_dfa(RE_WORD)
     assert g.accepts("abc")
     assert not g.accepts("abc de")
     assert g.accepts("12")
 
 
 def test_re_uint():
-    g = compile_dfa(RE_UINT)
+    g = make_dfa(RE_UINT)
     assert g.accepts("0")
     assert g.accepts("12")
     assert not g.accepts("-123")
@@ -0,0 +1,103 @@
+#!/usr/bin/env pytest
+# -*- coding: utf-8 -*-
+
+import pickle
+from fast.regexp_ast import (
+    RegexpAst,
+    SubtreeTable,
+    prefix_regexp_to_ast,
+)
+
+
+def test_subtree_table():
+    table = SubtreeTable()
+    ast1 = prefix_regexp_to_ast(["+", ".", "a", "b"], table)
+    ast2 = prefix_regexp_to_ast(["+", ".", "a", "b"], table)
+    ast3 = prefix_regexp_to_ast(["*", ".", "a", "b"], table)
+    assert ast1.key() == ast2.key()
+    assert ast1.key() != ast3.key()
+    assert ast1.copy().subtree_table is table
+    # Keys interned by distinct tables never match.
+    ast4 = prefix_regexp_to_ast(["+", ".", "a", "b"])
+    assert ast4.subtree_table is not table
+    assert ast4.key() not in table.map_subtree_key.values()
+    # A pickled AST is interned by a new table.
+    ast5 = pickle.loads(pickle.dumps(ast1))
+    assert ast5.subtree_table is not table
+    assert ast5.to_infix_regexp_str() == ast1.to_infix_regexp_str()
+    # The strings are memoized by the table of the AST.
+    assert "((a.b))+" in table.map_key_infix_str.values()
+    assert "((a.b))+" in ast5.subtree_table.map_key_infix_str.values()
+
+
+def make_ast(tree) -> RegexpAst:
+    # Builds a RegexpAst without simplifying it. A node is either a
+    # label (leaf) or a (label, children) pair.
+    ast = RegexpAst()
+    stack = [(ast.root, tree)]
+    while stack:
+        (u, tree) = stack.pop()
+        (label, children) = (tree, ()) if isinstance(tree, str) else tree
+        v = ast.add_node(label)
+        if u == ast.root:
+            ast.set_child(u, v)
+        else:
+            ast.append_child(u, v)
+        stack.extend((v, child) for child in reversed(children))
+    return ast
+
+
+def test_simplify_unary_and_n_ary_nodes():
+    # The expected results are the ones obtained by simplifying first
+    # the unary nodes, and then the n-ary nodes, in two distinct passes.
+    trees_expected = [
+        (("+", [("?", ["a"])]), "*a"),
+        (("?", [("?", [("+", ["a"])])]), "*a"),
+        (("+", [("+", ["a"])]), "+a"),
+        ((".", [(".", ["a", "b"]), "c"]), ".(a,b,c)"),
+        (
+            ("|", ["a", ("|", ["b", (".", ["c", (".", ["d", "e"])])])]),
+            "|(a,b,.(c,d,e))"
+        ),
+        (
+            (".", [
+                ("*", [("+", [(".", [(".", ["a", "b"]), "c"])])]),
+                ("|", [("|", ["a", "b"]), ("?", [("?", ["c"])])])
+            ]),
+            ".(*.(a,b,c),|(a,b,?c))"
+        ),
+        (
+            ("|", [
+                (".", ["a", (".", ["b", ("|", ["c", ("|", ["d", "a"])])])]),
+                ("+", [("*", [("?", ["b"])])])
+            ]),
+            "|(.(a,b,|(c,d,a)),*b)"
+        ),
+    ]
+    for (tree, expected) in trees_expected:
+        ast = make_ast(tree)
+        ast.simplify_unary_and_n_ary_nodes()
+        assert ast.to_prefix_regexp_str() == expected
+
+
+def test_regexp_ast_copy_on_write():
+    ast = prefix_regexp_to_ast([".", "a", "b"])
+    key = ast.key()
+    u = ast.first_child(ast.root)
+    copy = ast.copy()
+    # The children lists are shared until one of the ASTs modifies them.
+    assert copy.map_node_children[u] is ast.map_node_children[u]
+    copy.append_child(u, copy.add_node("c"))
+    copy.set_ith_child(u, copy.add_node("d"), 0)
+    assert copy.map_node_children[u] is not ast.map_node_children[u]
+    assert ast.to_prefix_regexp_str() == ".(a,b)"
+    assert ast.key() == key
+    # The keys of the modified nodes and of their ancestors are invalidated.
+    assert copy.to_prefix_regexp_str() == ".(d,b,c)"
+    assert copy.key() == prefix_regexp_to_ast(
+        [".", "d", ".", "b", "c"], copy.subtree_table
+    ).key()
+    # Modifying the original AST does not alter the copy either.
+    ast.append_child(u, ast.add_node("e"))
+    assert ast.to_prefix_regexp_str() == ".(a,b,e)"
+    assert copy.to_prefix_regexp_str() == ".(d,b,c)"